@@ -1,6 +1,7 @@
 import asyncio
 import argparse
 import json
+import time
 from fastmcp import Client
 
 # Define the URL of your FastMCP server
@@ -48,6 +49,119 @@ async def test_docs_tool(client: Client):
         print_response("Response for 'search_docs'", docs_response)
 
 
+# --- Concurrent Session Mode ---
+
+class ToolSession:
+    """
+    Keeps one MCP session open and runs many tool calls over it concurrently,
+    at most `concurrency` at a time. Also usable as an SDK from batch jobs:
+
+        async with ToolSession(SERVER_URL, concurrency=32) as session:
+            results = await session.call_many([("search_docs", {"keyword": "API"}), ...])
+
+    Pass `on_progress(progress, total, message)` and `on_partial_result(tool, result)`
+    to see long-running calls advance; `timeout` (seconds) cancels a call on the
+    server side as well.
+    """
+
+    def __init__(self, url: str = SERVER_URL, concurrency: int = 16, timeout: float | None = None,
+                 on_progress=None, on_partial_result=None):
+        self.client = Client(url, log_handler=self._handle_log)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.on_partial_result = on_partial_result
+
+    async def _handle_log(self, message):
+        data = message.data if isinstance(message.data, dict) else {}
+        extra = data.get("extra") or {}
+        if message.logger == "partial_result" and self.on_partial_result is not None:
+            await self.on_partial_result(extra.get("tool"), extra.get("result"))
+
+    async def __aenter__(self) -> "ToolSession":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.__aexit__(*exc_info)
+
+    async def call(self, tool: str, arguments: dict | None = None) -> dict:
+        """Runs one tool call and returns its result, error and latency; never raises."""
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await self.client.call_tool(
+                    tool, arguments or {}, timeout=self.timeout, progress_handler=self.on_progress,
+                    raise_on_error=False,
+                )
+                data = response.data
+                error = None
+                if response.is_error:
+                    error = " ".join(getattr(block, "text", "") for block in response.content) or "Tool call failed."
+                elif isinstance(data, dict) and "error" in data:
+                    error = data["error"]
+            except Exception as e:
+                data, error = None, f"{type(e).__name__}: {e}"
+            return {
+                "tool": tool, "arguments": arguments or {}, "result": data, "error": error,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+    async def call_many(self, calls: list[tuple[str, dict]]) -> list[dict]:
+        """Pipelines all calls over the session; results come back in the order of `calls`."""
+        return await asyncio.gather(*(self.call(tool, arguments) for tool, arguments in calls))
+
+
+def load_workload(path: str) -> list[tuple[str, dict]]:
+    """
+    Reads a recorded workload: one JSON object per line, e.g.
+    {"tool": "search_docs", "arguments": {"keyword": "API"}}. Blank lines are skipped.
+    """
+    calls = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                calls.append((entry["tool"], entry.get("arguments") or {}))
+    return calls
+
+
+async def print_progress(progress: float, total: float | None, message: str | None):
+    print(f"  [{progress:g}/{total:g}] {message or ''}" if total else f"  [{progress:g}] {message or ''}")
+
+
+async def print_partial_result(tool: str, result: dict):
+    label = result.get("path") if isinstance(result, dict) else None
+    print(f"  partial result from '{tool}': {label or result}")
+
+
+async def replay_workload(path: str, concurrency: int, output: str | None = None,
+                          timeout: float | None = None, show_progress: bool = False):
+    """Replays a workload file over one session and prints a throughput summary."""
+    calls = load_workload(path)
+    handlers = {"on_progress": print_progress, "on_partial_result": print_partial_result} if show_progress else {}
+    async with ToolSession(SERVER_URL, concurrency=concurrency, timeout=timeout, **handlers) as session:
+        started = time.perf_counter()
+        results = await session.call_many(calls)
+        elapsed = time.perf_counter() - started
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    errors = sum(1 for result in results if result["error"])
+    latencies = sorted(result["latency_ms"] for result in results)
+    print(json.dumps({
+        "calls": len(results),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }, indent=2))
+
+
 async def main():
     """
     Main function to connect to the server and run specified tests.
@@ -56,8 +170,17 @@ async def main():
     parser.add_argument("--test-all", action="store_true", help="Run all available tests.")
     parser.add_argument("--test-github", action="store_true", help="Run only the GitHub integration tests.")
     parser.add_argument("--test-docs", action="store_true", help="Run only the documentation search test.")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recorded JSONL workload concurrently over one session.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Tool calls in flight at once in --replay mode.")
+    parser.add_argument("--output", metavar="FILE", help="Write each replayed call's result to this JSONL file.")
+    parser.add_argument("--timeout", type=float, help="Cancel replayed calls that take longer than this (seconds).")
+    parser.add_argument("--progress", action="store_true", help="Print progress and partial results in --replay mode.")
     args = parser.parse_args()
 
+    if args.replay:
+        await replay_workload(args.replay, args.concurrency, args.output, args.timeout, args.progress)
+        return
+
     # Default to --test-all if no specific test is requested
     if not (args.test_github or args.test_docs):
         args.test_all = True
@@ -0,0 +1,107 @@
+"""
+Circuit breaker and hedged requests for upstream GitHub calls.
+
+CircuitBreaker
+    closed     calls go through; consecutive failures are counted.
+    open       after `failure_threshold` consecutive failures, calls are refused
+               (the caller serves from its cache instead) for `reset_timeout` s.
+    half-open  after that, a single probe call is let through. Success closes
+               the circuit, failure opens it again for another `reset_timeout`.
+
+LatencyTracker keeps the latencies of recent successful calls. `hedged()`
+starts a second, identical request when the first has not answered within the
+running p95, and returns whichever finishes first. Only use it for idempotent
+requests.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Returns True if a call may go upstream now."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Open long enough (or the last probe never answered): let one probe through.
+        self.state = HALF_OPEN
+        self.opened_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                print(f"GitHub circuit opened after {self.failures} consecutive failures.")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        """The pct-th percentile of the window, or None until enough samples were seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def hedged(call: Callable[[], Awaitable], delay: float | None,
+                 may_hedge: Callable[[], Awaitable[bool]]):
+    """
+    Awaits `call()`. If it has not finished after `delay` seconds and
+    `may_hedge()` agrees, starts `call()` a second time and returns the first
+    successful result; the slower request is cancelled.
+    """
+    first = asyncio.ensure_future(call())
+    tasks = {first}
+    try:
+        if delay is None:
+            return await first
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not await may_hedge():
+            return await first
+        tasks.add(asyncio.ensure_future(call()))
+        while True:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # A failed request only decides the outcome if the other one failed too.
+                if task.exception() is None or not pending:
+                    return task.result()
+            tasks = pending
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,184 @@
+# Copy of MCPAssignment/server/metrics.py, the source of truth. Do not edit it here:
+# change that file and run server/sync_shared_modules.py.
+"""
+Minimal Prometheus-style metrics for the tool servers.
+
+Counters, gauges and histograms keep their samples in plain dicts keyed by the
+label values, so recording a sample is a dict update (plus a bisect for
+histograms): well under a microsecond, cheap enough to leave on in production.
+Samples are written from the event loop thread only. `render()` produces the
+Prometheus text exposition format for a `/metrics` endpoint.
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow upstream calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: tuple, labelvalues: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name, self.help_text, self.labelnames = name, help_text, labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        for labelvalues, value in self._values.items():
+            yield self.name + _format_labels(self.labelnames, labelvalues), value
+
+
+class Gauge(Counter):
+    """A value that goes up and down. `callback` computes it at scrape time instead."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), callback: Callable[[], float] | None = None):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+
+    def set(self, value: float, *labelvalues) -> None:
+        self._values[labelvalues] = value
+
+    def dec(self, *labelvalues, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) - amount
+
+    def samples(self):
+        if self.callback is not None:
+            yield self.name, self.callback()
+            return
+        yield from super().samples()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help_text, self.labelnames, self.buckets = name, help_text, labelnames, buckets
+        # labelvalues -> [per-bucket counts (+Inf last), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        entry = self._values.get(labelvalues)
+        if entry is None:
+            entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self):
+        for labelvalues, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield self.name + "_bucket" + _format_labels(self.labelnames, labelvalues, f'le="{bound}"'), cumulative
+            cumulative += counts[-1]
+            yield self.name + "_bucket" + _format_labels(self.labelnames, labelvalues, 'le="+Inf"'), cumulative
+            yield self.name + "_sum" + _format_labels(self.labelnames, labelvalues), total
+            yield self.name + "_count" + _format_labels(self.labelnames, labelvalues), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# --- Metrics Shared by the Tool Servers ---
+
+REGISTRY = Registry()
+TOOL_CALLS = REGISTRY.counter("tool_calls_total", "Tool calls by tool and outcome.", ("tool", "status"))
+TOOL_LATENCY = REGISTRY.histogram("tool_call_duration_seconds", "Tool call latency.", ("tool",))
+TOOLS_IN_FLIGHT = REGISTRY.gauge("tool_calls_in_flight", "Tool calls currently executing.")
+GITHUB_LATENCY = REGISTRY.histogram("github_request_duration_seconds", "Upstream GitHub API latency.", ("status",))
+GITHUB_CACHE = REGISTRY.counter("github_cache_requests_total", "GitHub requests by ETag cache outcome.", ("result",))
+GITHUB_RATE_LIMIT_REMAINING = REGISTRY.gauge(
+    "github_ratelimit_remaining", "X-RateLimit-Remaining from the latest GitHub response."
+)
+
+
+def record_github_response(status_code: int, seconds: float, headers) -> None:
+    """Records latency, cache outcome and remaining quota for one upstream response."""
+    GITHUB_LATENCY.observe(seconds, str(status_code))
+    GITHUB_CACHE.inc("hit" if status_code == 304 else "miss")
+    remaining = headers.get("x-ratelimit-remaining")
+    if remaining is not None:
+        GITHUB_RATE_LIMIT_REMAINING.set(float(remaining))
+
+
+def tool_status(result) -> str:
+    return "error" if isinstance(result, dict) and "error" in result else "ok"
+
+
+def record_tool_call(name: str, status: str, seconds: float) -> None:
+    TOOL_CALLS.inc(name, status)
+    TOOL_LATENCY.observe(seconds, name)
+
+
+def instrument_tool(func):
+    """Wraps a tool so its calls, errors, latency and concurrency are recorded."""
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            TOOLS_IN_FLIGHT.inc()
+            started, status = time.perf_counter(), "error"
+            try:
+                result = await func(*args, **kwargs)
+                status = tool_status(result)
+                return result
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                TOOLS_IN_FLIGHT.dec()
+                record_tool_call(name, status, time.perf_counter() - started)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        TOOLS_IN_FLIGHT.inc()
+        started, status = time.perf_counter(), "error"
+        try:
+            result = func(*args, **kwargs)
+            status = tool_status(result)
+            return result
+        finally:
+            TOOLS_IN_FLIGHT.dec()
+            record_tool_call(name, status, time.perf_counter() - started)
+    return wrapper
@@ -0,0 +1,292 @@
+"""
+Token-bucket limiter for outbound GitHub API calls.
+
+The bucket refills continuously, so the hourly quota is spread out instead of
+being reset in one step. Until GitHub has answered, it assumes the configured
+hourly limit. After that, every response's X-RateLimit-Remaining /
+X-RateLimit-Reset headers re-sync the bucket, and the remaining quota is paced
+evenly over the time left until the reset.
+
+Callers that find the bucket empty wait in FIFO order instead of failing. They
+only get GitHubRateLimitExceeded when the wait would exceed `max_wait`. When
+GitHub rejects a call with a primary or secondary rate limit, the limiter
+pauses everyone for Retry-After (or an exponential backoff).
+
+Where the bucket state lives is pluggable:
+
+- MemoryBackend: in-process, checkpointed to a JSON file periodically and on
+  shutdown, never on the request path. For a single server process.
+- SQLiteBackend: one row in a SQLite database in WAL mode, updated in an
+  IMMEDIATE transaction. Every worker process or host that shares the file
+  (and the GitHub token) draws from the same budget.
+"""
+
+import asyncio
+import dataclasses
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import httpx
+
+WINDOW_SECONDS = 3600
+# Backoff used for secondary limits that come without a Retry-After header.
+SECONDARY_LIMIT_BACKOFF = 60
+
+
+class GitHubRateLimitExceeded(Exception):
+    pass
+
+
+def rate_limit_delay(response: httpx.Response, attempt: int) -> float | None:
+    """
+    Returns how long to wait before retrying if `response` is a GitHub rate
+    limit rejection (403/429), or None if it is not.
+    """
+    if response.status_code not in (403, 429):
+        return None
+    headers = response.headers
+    if "retry-after" in headers:
+        return float(headers["retry-after"])
+    if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+        return max(0.0, float(headers["x-ratelimit-reset"]) - time.time()) + 1
+    if response.status_code == 429 or "rate limit" in response.text.lower():
+        return SECONDARY_LIMIT_BACKOFF * (2 ** attempt)
+    return None
+
+
+@dataclass
+class BucketState:
+    limit: int
+    capacity: float
+    refill_rate: float    # tokens per second
+    tokens: float
+    updated_at: float
+    blocked_until: float = 0.0
+
+    @classmethod
+    def full(cls, limit: int) -> "BucketState":
+        return cls(limit, float(limit), limit / WINDOW_SECONDS, float(limit), time.time())
+
+    def refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        token_wait = (1 - self.tokens) / self.refill_rate if self.tokens < 1 else 0.0
+        return max(token_wait, self.blocked_until - now)
+
+
+# --- Backends ---
+
+class MemoryBackend:
+    """Keeps the bucket in process memory, checkpointed to a JSON state file."""
+
+    def __init__(self, limit: int, state_file: str | None = None):
+        self.state = BucketState.full(limit)
+        self.state_file = state_file
+        self._dirty = False
+
+    async def update(self, mutate: Callable[[BucketState], object]):
+        # Runs without awaiting, so it is atomic with respect to the event loop.
+        result = mutate(self.state)
+        self._dirty = True
+        return result
+
+    def load(self) -> None:
+        """Restores the bucket from the state file, accounting for the time since it was saved."""
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        state = self.state
+        if "tokens" in saved:
+            state.capacity = float(saved.get("capacity", state.capacity))
+            state.refill_rate = float(saved.get("refill_rate", state.refill_rate))
+            state.tokens = min(state.capacity, float(saved["tokens"]))
+            state.updated_at = float(saved["updated_at"])
+            state.blocked_until = float(saved.get("blocked_until", 0.0))
+        elif "count" in saved and time.time() - saved["window_start"] <= WINDOW_SECONDS:
+            # Legacy fixed-window format: {"count": n, "window_start": t}.
+            state.tokens = float(max(0, state.limit - saved["count"]))
+            state.updated_at = float(saved["window_start"])
+        state.refill(time.time())
+
+    async def checkpoint(self) -> None:
+        """Writes the bucket to the state file (off the event loop) if it changed."""
+        if not self.state_file or not self._dirty:
+            return
+        saved = dataclasses.asdict(self.state)
+        self._dirty = False
+        await asyncio.to_thread(self._write_state, saved)
+
+    def _write_state(self, saved: dict) -> None:
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, self.state_file)
+
+
+class SQLiteBackend:
+    """Keeps the bucket in a shared SQLite file so several processes share one budget."""
+
+    def __init__(self, limit: int, path: str, key: str = "github"):
+        self.limit = limit
+        self.path = path
+        self.key = key
+        self.state = BucketState.full(limit)  # last state seen by this process
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, limit_value INTEGER, capacity REAL, refill_rate REAL, "
+            "tokens REAL, updated_at REAL, blocked_until REAL)"
+        )
+
+    async def update(self, mutate: Callable[[BucketState], object]):
+        return await asyncio.to_thread(self._update, mutate)
+
+    def _update(self, mutate: Callable[[BucketState], object]):
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so read-modify-write is atomic across processes.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT limit_value, capacity, refill_rate, tokens, updated_at, blocked_until "
+                    "FROM rate_limit_buckets WHERE key = ?", (self.key,)
+                ).fetchone()
+                state = BucketState(*row) if row else BucketState.full(self.limit)
+                result = mutate(state)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.key, state.limit, state.capacity, state.refill_rate,
+                     state.tokens, state.updated_at, state.blocked_until),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.state = state
+            return result
+
+    def load(self) -> None:
+        pass  # Always persistent.
+
+    async def checkpoint(self) -> None:
+        pass  # Every update is already committed.
+
+
+# --- Limiter ---
+
+class TokenBucketLimiter:
+    def __init__(self, backend: MemoryBackend | SQLiteBackend, burst: int | None = None,
+                 max_wait: float = 60.0):
+        self.backend = backend
+        # Largest number of calls allowed back to back once GitHub's headers are known.
+        self.burst = burst or backend.state.limit
+        self.max_wait = max_wait
+        self._lock = asyncio.Lock()  # queues this process's waiting callers in FIFO order
+
+    async def acquire(self) -> None:
+        """
+        Takes one token, waiting for it if necessary. Raises
+        GitHubRateLimitExceeded if the wait would exceed `max_wait`.
+        """
+        def take(state: BucketState) -> float:
+            now = time.time()
+            state.refill(now)
+            wait = state.wait_time(now)
+            if wait <= 0:
+                state.tokens -= 1
+            return wait
+
+        async with self._lock:
+            while True:
+                wait = await self.backend.update(take)
+                if wait <= 0:
+                    return
+                if wait > self.max_wait:
+                    raise GitHubRateLimitExceeded(
+                        f"GitHub API rate limit ({self.backend.state.limit}/hour) exceeded. "
+                        f"Try again in {wait:.0f}s."
+                    )
+                await asyncio.sleep(wait)
+
+    async def try_acquire(self) -> bool:
+        """Takes one token only if one is available right now, without waiting."""
+        def take(state: BucketState) -> bool:
+            now = time.time()
+            state.refill(now)
+            if state.wait_time(now) > 0:
+                return False
+            state.tokens -= 1
+            return True
+
+        return await self.backend.update(take)
+
+    async def refund(self) -> None:
+        """Gives a token back for a request GitHub did not charge for (e.g. a 304)."""
+        def give_back(state: BucketState) -> None:
+            state.tokens = min(state.capacity, state.tokens + 1)
+
+        await self.backend.update(give_back)
+
+    async def sync_from_headers(self, headers: httpx.Headers) -> None:
+        """Re-aligns the bucket with GitHub's view of the quota and paces it until the reset."""
+        if "x-ratelimit-remaining" not in headers or "x-ratelimit-reset" not in headers:
+            return
+        remaining = int(headers["x-ratelimit-remaining"])
+        reset_at = float(headers["x-ratelimit-reset"])
+
+        def sync(state: BucketState) -> None:
+            now = time.time()
+            state.limit = int(headers.get("x-ratelimit-limit", state.limit))
+            state.refill(now)
+            if remaining <= 0:
+                state.tokens = 0.0
+                state.blocked_until = max(state.blocked_until, reset_at)
+            else:
+                state.refill_rate = remaining / max(1.0, reset_at - now)
+                state.capacity = float(max(1, min(self.burst, remaining)))
+                state.tokens = min(state.tokens, state.capacity)
+
+        await self.backend.update(sync)
+
+    async def pause(self, seconds: float) -> None:
+        """Blocks every caller for `seconds`, e.g. after a Retry-After from GitHub."""
+        until = time.time() + seconds
+
+        def block(state: BucketState) -> None:
+            state.blocked_until = max(state.blocked_until, until)
+
+        await self.backend.update(block)
+
+    @property
+    def remaining(self) -> int:
+        return int(self.backend.state.tokens)
+
+    # --- Checkpointing ---
+
+    def load(self) -> None:
+        self.backend.load()
+
+    async def checkpoint(self) -> None:
+        await self.backend.checkpoint()
+
+    async def run_checkpoints(self, interval: float) -> None:
+        """Checkpoints every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.checkpoint()
+            except OSError as e:
+                print(f"Could not checkpoint rate limit state: {e}")
@@ -2,7 +2,7 @@
 FastMCP server with outbound rate limiting to manage the GitHub API quota.
 
 - Outbound Limit: Manages the server's API quota with GitHub, respecting the 5000/hr
-  (authenticated) or 1000/hr (unauthenticated) limits.
+  (authenticated) or 1000/hr (unauthenticated) limits of each token in GITHUB_TOKENS.
 
 Requires a .env file. GITHUB_TOKEN is optional.
 """
@@ -11,158 +11,473 @@ import os
 import base64
 import httpx
 import uvicorn
+import asyncio
 import time
-import json
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from github_cache import GitHubResponseCache
+from github_clients import HostClients, TokenRotation, auth_headers, parse_tokens, token_fingerprint
+from single_flight import SingleFlight
+from circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+import metrics
+from metrics import instrument_tool
+from docs_index import LiveDocsIndex
+from docs_pack import PackedDocsIndex
+from warmup import Warmup, open_connections
+from rate_limiter import (
+    GitHubRateLimitExceeded, MemoryBackend, SQLiteBackend, TokenBucketLimiter, rate_limit_delay,
+)
 
 # --- Configuration ---
 load_dotenv()
 # GITHUB_TOKEN is now optional. The server will adapt.
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Several tokens (comma-separated) are rotated, each request using the one with the most quota left.
+GITHUB_TOKENS = parse_tokens(os.getenv("GITHUB_TOKENS"), GITHUB_TOKEN)
+# Default repository; every GitHub tool also takes optional `owner` / `repo` arguments.
 GITHUB_REPO_OWNER = os.getenv("GITHUB_REPO_OWNER")
 GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME")
 DOCS_DIRECTORY = "docs"
 STATE_FILE = "rate_limit_state.json"
-
-# --- Validate Configuration ---
-if not all([GITHUB_REPO_OWNER, GITHUB_REPO_NAME]):
-    raise ValueError("Missing GITHUB_REPO_OWNER or GITHUB_REPO_NAME in .env file.")
+# How often (seconds) the in-memory rate limit state is checkpointed to STATE_FILE.
+RATE_LIMIT_CHECKPOINT_INTERVAL = float(os.getenv("RATE_LIMIT_CHECKPOINT_INTERVAL", "30"))
+# "memory" (single process) or "sqlite" (budget shared by every worker using RATE_LIMIT_DB).
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limit_state.db")
+# Calls wait (queued) for up to this many seconds for outbound quota before failing.
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+# Largest back-to-back burst once the quota is paced from GitHub's X-RateLimit-* headers.
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "50"))
+# How many times a call rejected by GitHub's primary/secondary limit is retried.
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+# How often (seconds) the docs directory is polled for changes; 0 disables watching.
+DOCS_WATCH_INTERVAL = float(os.getenv("DOCS_WATCH_INTERVAL", "2"))
+# Optional docs pack built with `python server/docs_pack.py docs docs.pack`. When set,
+# search_docs runs on the memory-mapped pack (shared by all workers) and nothing is watched.
+DOCS_PACK = os.getenv("DOCS_PACK")
+# ETag cache for GitHub responses. Set GITHUB_CACHE_DIR to keep it across restarts.
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR")
+# Explicit upstream timeouts (seconds), so a degraded GitHub cannot hold calls for long.
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "3"))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "10"))
+# The circuit opens after this many consecutive upstream failures (errors, timeouts,
+# 5xx) and lets a probe through after CIRCUIT_RESET_TIMEOUT seconds. While it is
+# open, calls are answered from the ETag cache.
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+# Hedged GETs: when a request is slower than the running p95 (and at least
+# GITHUB_HEDGE_MIN_DELAY seconds), a duplicate is sent if the bucket has a spare token.
+GITHUB_HEDGE_REQUESTS = os.getenv("GITHUB_HEDGE_REQUESTS", "false").lower() == "true"
+GITHUB_HEDGE_MIN_DELAY = float(os.getenv("GITHUB_HEDGE_MIN_DELAY", "0.1"))
+# How many files one get_file_contents call fetches from GitHub at the same time.
+FILE_FETCH_CONCURRENCY = int(os.getenv("FILE_FETCH_CONCURRENCY", "8"))
+# Startup warmup (see warmup.py): connections opened to GitHub ahead of traffic,
+# hot paths of the default repository fetched into the ETag cache ("/" is the
+# repository itself; empty disables), and how long (seconds) /readyz waits for it.
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+WARMUP_GITHUB_PATHS = [
+    path.strip() for path in os.getenv("WARMUP_GITHUB_PATHS", "/,/contents/README.md").split(",") if path.strip()
+]
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
 
 # --- GitHub API Constants ---
-GITHUB_API_BASE_URL = f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}"
+# GITHUB_API_URL can point at a local mock API (see MCPAssignment/benchmark/mock_github.py).
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 
-# --- Custom Exception for Outbound Limit ---
-class GitHubRateLimitExceeded(Exception):
-    pass
+def repo_api_url(owner: str | None = None, repo: str | None = None) -> str:
+    """
+    Builds the API URL of a repository. `repo` may also be given as "owner/name";
+    missing parts fall back to GITHUB_REPO_OWNER / GITHUB_REPO_NAME.
+    """
+    if owner is None and repo and "/" in repo:
+        owner, repo = repo.split("/", 1)
+    owner, repo = owner or GITHUB_REPO_OWNER, repo or GITHUB_REPO_NAME
+    if not (owner and repo):
+        raise ValueError("No repository given and GITHUB_REPO_OWNER / GITHUB_REPO_NAME are not set.")
+    return f"{GITHUB_API_URL}/repos/{owner}/{repo}"
 
-# --- Outbound Rate Limit State Management ---
-def load_rate_limit_state():
-    """Loads the request count and timestamp from the state file."""
-    try:
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"count": 0, "window_start": time.time()}
+# --- Outbound Rate Limiters ---
+# One token bucket per GitHub token, re-synced from GitHub's X-RateLimit-* headers.
+# With the memory backend, the state files are only written by the periodic
+# checkpoint task and on shutdown; the sqlite backend shares one atomic budget
+# per token across worker processes. The first token keeps the original state
+# file / row, so single-token deployments carry their state over.
+def outbound_limit(token: str | None) -> int:
+    return 5000 if token else 1000
+
+def create_rate_limit_backend(token: str | None, index: int):
+    suffix = "" if index == 0 else f".{token_fingerprint(token)}"
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(outbound_limit(token), RATE_LIMIT_DB, key="github" + suffix)
+    if RATE_LIMIT_BACKEND == "memory":
+        state_file = STATE_FILE if index == 0 else STATE_FILE.replace(".json", f"{suffix}.json")
+        return MemoryBackend(outbound_limit(token), state_file=state_file)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{RATE_LIMIT_BACKEND}'. Use 'memory' or 'sqlite'.")
+
+rate_limiters = {
+    token: TokenBucketLimiter(
+        create_rate_limit_backend(token, index), burst=RATE_LIMIT_BURST, max_wait=RATE_LIMIT_MAX_WAIT
+    )
+    for index, token in enumerate(GITHUB_TOKENS)
+}
+for limiter in rate_limiters.values():
+    limiter.load()
+token_rotation = TokenRotation(GITHUB_TOKENS)
+
+# --- Shared GitHub HTTP Clients ---
+# One pooled client per host, opened on first use and closed at shutdown, shared
+# by every repository and token (the token is sent per request).
+github_clients = HostClients(
+    headers={"Accept": "application/vnd.github.v3+json"},
+    timeout=httpx.Timeout(GITHUB_READ_TIMEOUT, connect=GITHUB_CONNECT_TIMEOUT),
+)
 
-def save_rate_limit_state(state):
-    """Saves the current state to the file."""
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
+# --- Circuit Breaker & Hedging ---
+GITHUB_HEDGED_REQUESTS = metrics.REGISTRY.counter("github_hedged_requests_total", "Duplicate GETs sent to GitHub.")
+GITHUB_STALE_RESPONSES = metrics.REGISTRY.counter(
+    "github_stale_responses_total", "Responses served from cache because GitHub was failing."
+)
+github_circuit = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+github_latency = LatencyTracker()
+
+def hedge_delay() -> float | None:
+    """How long to wait before hedging a GET, or None to not hedge it."""
+    if not GITHUB_HEDGE_REQUESTS or github_circuit.state != CLOSED:
+        return None
+    p95 = github_latency.percentile(95)
+    return None if p95 is None else max(p95, GITHUB_HEDGE_MIN_DELAY)
+
+async def reserve_hedge(rate_limiter: TokenBucketLimiter) -> bool:
+    """A hedge costs quota too, so it is only sent if a token is free right now."""
+    if await rate_limiter.try_acquire():
+        GITHUB_HEDGED_REQUESTS.inc()
+        return True
+    return False
+
+def serve_stale(url: str, cached, reason: str) -> httpx.Response:
+    """Answers from the last cached copy while GitHub is failing."""
+    GITHUB_STALE_RESPONSES.inc()
+    print(f"Serving cached copy of {url} ({reason}).")
+    return github_cache.build_response(cached, httpx.Request("GET", url), cache_status="stale")
+
+# --- Conditional-Request Cache ---
+github_cache = GitHubResponseCache(max_bytes=GITHUB_CACHE_MAX_BYTES, disk_dir=GITHUB_CACHE_DIR)
 
 # --- Centralized API Request "Gatekeeper" Function ---
+# Identical concurrent requests share one upstream call. Every caller uses the
+# server's own pool of tokens, so the URL alone identifies a request.
+github_single_flight = SingleFlight()
+
 async def make_github_api_request(url: str) -> httpx.Response:
     """
     Makes a rate-limited, authenticated request to the GitHub API.
     This function is the single point of control for all outgoing API calls.
+    Concurrent callers asking for the same URL are coalesced into a single
+    upstream request, which costs the hourly budget only once.
     """
-    limit = 5000 if GITHUB_TOKEN else 1000
-    state = load_rate_limit_state()
-    
-    # Check if the 1-hour window has passed
-    if time.time() - state["window_start"] > 3600:
-        print("Hourly rate limit window reset.")
-        state["count"] = 0
-        state["window_start"] = time.time()
-
-    # Check if the limit has been reached
-    if state["count"] >= limit:
-        raise GitHubRateLimitExceeded(
-            f"GitHub API rate limit ({limit}/hour) exceeded. Try again later."
-        )
-
-    # Prepare headers based on authentication status
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if GITHUB_TOKEN:
-        headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
-
-    # Make the actual API call
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status() # Raise an exception for 4xx/5xx responses
-    
-    # If successful, increment count and save state
-    state["count"] += 1
-    save_rate_limit_state(state)
-    print(f"GitHub API call successful. Count is now {state['count']}/{limit} for this window.")
+    return await github_single_flight.do(url, lambda: fetch_from_github(url))
+
+async def fetch_from_github(url: str) -> httpx.Response:
+    """
+    Performs one outbound GitHub request on behalf of the gatekeeper.
+    Cached responses are revalidated with If-None-Match; a 304 answer is served
+    from the cache and is not counted, since GitHub does not charge for it.
+    While the circuit is open, or when GitHub fails, the cached copy is served as is.
+    """
+    cached = await github_cache.get(url)
+    if not github_circuit.allow():
+        if cached is None:
+            raise CircuitOpenError(
+                f"GitHub is unavailable and this request is not cached. "
+                f"Try again in {github_circuit.retry_after():.0f}s."
+            )
+        return serve_stale(url, cached, "circuit open")
+    client = github_clients.get(url)
+
+    # Make the actual API call. Calls rejected by GitHub's rate limits are queued
+    # again behind a pause (Retry-After or backoff) instead of failing right away;
+    # the rejected token is skipped meanwhile, so a retry can go out with another one.
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        token = token_rotation.choose()
+        rate_limiter = rate_limiters[token]
+        # Take a token from that GitHub token's bucket (waits, or raises if the wait is too long)
+        await rate_limiter.acquire()
+        headers = {**auth_headers(token), **github_cache.conditional_headers(cached)}
+        started = time.perf_counter()
+        try:
+            response = await hedged(
+                lambda: client.get(url, headers=headers), hedge_delay(), lambda: reserve_hedge(rate_limiter)
+            )
+        except httpx.TransportError as e:
+            github_circuit.record_failure()
+            if cached is None:
+                raise
+            return serve_stale(url, cached, f"{type(e).__name__}")
+        elapsed = time.perf_counter() - started
+        metrics.record_github_response(response.status_code, elapsed, response.headers)
+        if response.status_code >= 500:
+            github_circuit.record_failure()
+            if cached is not None:
+                return serve_stale(url, cached, f"status {response.status_code}")
+        else:
+            github_circuit.record_success()
+            github_latency.observe(elapsed)
+        token_rotation.update(token, response.headers)
+        await rate_limiter.sync_from_headers(response.headers)
+        delay = rate_limit_delay(response, attempt)
+        if delay is None or attempt == RATE_LIMIT_MAX_RETRIES:
+            break
+        print(f"GitHub rate limit hit (status {response.status_code}); retrying in {delay:.0f}s.")
+        token_rotation.block(token, delay)
+        await rate_limiter.pause(delay)
+    if response.status_code == 304 and cached is not None:
+        await rate_limiter.refund()
+        print("GitHub API call revalidated from cache (not counted).")
+        return github_cache.build_response(cached, response.request)
+    response.raise_for_status() # Raise an exception for 4xx/5xx responses
+    await github_cache.put(url, response)
+    print(f"GitHub API call successful. {rate_limiter.remaining}/{outbound_limit(token)} requests left in the bucket.")
     
     return response
 
+# --- Docs Search Index ---
+# Built once at startup so search_docs never scans the docs directory per request,
+# then kept fresh by a background watcher that re-indexes only changed files.
+# With DOCS_PACK, the prebuilt pack is memory-mapped instead.
+docs_index = PackedDocsIndex(DOCS_PACK) if DOCS_PACK else LiveDocsIndex(DOCS_DIRECTORY)
+docs_index.load()
+
+# --- Warmup & Readiness ---
+# /readyz reports ready once these steps have run (see warmup.py).
+warmup = Warmup(WARMUP_TIMEOUT)
+
+async def warm_github_connections():
+    """
+    Opens pooled connections to GitHub and syncs every token's bucket from its
+    current quota (GET /rate_limit is free).
+    """
+    url = f"{GITHUB_API_URL}/rate_limit"
+    for token, response in await open_connections(github_clients.get(url), url, GITHUB_TOKENS, WARMUP_CONNECTIONS):
+        token_rotation.update(token, response.headers)
+        await rate_limiters[token].sync_from_headers(response.headers)
+
+async def warm_github_paths():
+    """Fetches the hot paths of the default repository into the ETag cache."""
+    base_url = repo_api_url()
+    await asyncio.gather(*(
+        make_github_api_request(f"{base_url}/{path.strip('/')}".rstrip("/")) for path in WARMUP_GITHUB_PATHS
+    ))
+
+async def warm_docs_index():
+    if DOCS_PACK:
+        await asyncio.to_thread(docs_index.prefetch)
+
+warmup.step("github_connections", warm_github_connections)
+if WARMUP_GITHUB_PATHS and GITHUB_REPO_OWNER and GITHUB_REPO_NAME:
+    warmup.step("github_paths", warm_github_paths)
+warmup.step("docs_index", warm_docs_index)
+
+@asynccontextmanager
+async def lifespan(server):
+    watch = DOCS_WATCH_INTERVAL > 0 and not DOCS_PACK
+    watcher = asyncio.create_task(docs_index.watch(DOCS_WATCH_INTERVAL)) if watch else None
+    checkpointers = [
+        asyncio.create_task(limiter.run_checkpoints(RATE_LIMIT_CHECKPOINT_INTERVAL))
+        for limiter in rate_limiters.values()
+    ]
+    warming = asyncio.create_task(warmup.run())
+    try:
+        yield
+    finally:
+        # Out of the load balancer's rotation while draining.
+        warmup.ready = False
+        warming.cancel()
+        if watcher is not None:
+            watcher.cancel()
+        for checkpointer in checkpointers:
+            checkpointer.cancel()
+        for limiter in rate_limiters.values():
+            await limiter.checkpoint()
+        await github_clients.aclose()
+
 # --- MCP Server Instance ---
-mcp = FastMCP("GitHub & Docs Server")
+mcp = FastMCP("GitHub & Docs Server", lifespan=lifespan)
+
+# --- Metrics ---
+metrics.REGISTRY.gauge(
+    "rate_limiter_tokens_remaining", "Tokens left in the outbound GitHub buckets of all tokens.",
+    callback=lambda: sum(limiter.backend.state.tokens for limiter in rate_limiters.values()),
+)
+
+metrics.REGISTRY.gauge(
+    "github_circuit_state", "GitHub circuit breaker state (0 closed, 1 half-open, 2 open).",
+    callback=lambda: {"closed": 0, "half_open": 1, "open": 2}[github_circuit.state],
+)
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """Exposes tool, upstream, cache and limiter metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness: the process is up and its event loop answers."""
+    return JSONResponse({"status": "ok"})
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness: 503 until the startup warmup has finished, and again while shutting down."""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+
+# --- Progress & Partial Results ---
+# Tools take an optional FastMCP Context. Progress goes out as MCP progress
+# notifications (only when the client sent a progress token); pieces of a result
+# that are ready early go out as log notifications from the "partial_result"
+# logger, with the piece in `extra.result`. When the client cancels a call, the
+# tool's task is cancelled: it stops its pending work and re-raises.
+
+async def report_progress(ctx: Context | None, progress: float, total: float, message: str) -> None:
+    if ctx is not None:
+        await ctx.report_progress(progress, total, message)
+
+async def send_partial_result(ctx: Context | None, tool: str, result: dict) -> None:
+    if ctx is not None:
+        await ctx.log(f"Partial result of '{tool}'", level="info", logger_name="partial_result",
+                      extra={"tool": tool, "result": result})
 
 
 # --- Tool Implementations (Refactored to use the gatekeeper) ---
 
 @mcp.tool()
-async def get_repository() -> dict:
-    """Retrieves repo info. Respects outbound GitHub rate limits."""
+@instrument_tool
+async def get_repository(owner: str | None = None, repo: str | None = None, ctx: Context | None = None) -> dict:
+    """Retrieves repo info (default: the configured repo). Respects outbound GitHub rate limits."""
     try:
-        print("Tool 'get_repository' called.")
+        print(f"Tool 'get_repository' called with owner: {owner}, repo: {repo}")
+        url = repo_api_url(owner, repo)
+        await report_progress(ctx, 0, 2, f"Fetching {url}")
         # Outbound limit check and API call via the gatekeeper
-        response = await make_github_api_request(GITHUB_API_BASE_URL)
+        response = await make_github_api_request(url)
+        await report_progress(ctx, 1, 2, "Parsing repository metadata")
         repo_data = response.json()
-        
-        return {
+        result = {
             "name": repo_data.get("full_name"),
             "description": repo_data.get("description"),
             "stars": repo_data.get("stargazers_count"),
         }
-    except GitHubRateLimitExceeded as e:
+        await report_progress(ctx, 2, 2, "Done")
+        return result
+    except asyncio.CancelledError:
+        print("Tool 'get_repository' cancelled by the client.")
+        raise
+    except (GitHubRateLimitExceeded, CircuitOpenError) as e:
         return {"error": str(e)}
     except httpx.HTTPStatusError as http_err:
         return {"error": f"HTTP error: {http_err}", "status_code": http_err.response.status_code}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {type(e).__name__} - {e}"}
 
-@mcp.tool()
-async def get_file_content(path: str = 'README.md') -> dict:
-    """Retrieves file content. Respects outbound GitHub rate limits."""
+async def fetch_file(base_url: str, path: str) -> dict:
+    """Fetches and decodes one file of a repository; failures come back as an error dict."""
     try:
-        print(f"Tool 'get_file_content' called with path: {path}")
         # Outbound limit check and API call via the gatekeeper
-        url = f"{GITHUB_API_BASE_URL}/contents/{path}"
-        response = await make_github_api_request(url)
+        response = await make_github_api_request(f"{base_url}/contents/{path}")
         content_data = response.json()
         
         if content_data.get("encoding") != "base64":
-            return {"error": "File content is not base64 encoded as expected."}
+            return {"path": path, "error": "File content is not base64 encoded as expected."}
         decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
         return {"path": path, "content": decoded_content}
-    except GitHubRateLimitExceeded as e:
-        return {"error": str(e)}
+    except (GitHubRateLimitExceeded, CircuitOpenError) as e:
+        return {"path": path, "error": str(e)}
     except httpx.HTTPStatusError as http_err:
-        return {"error": f"HTTP error for path '{path}': {http_err}", "status_code": http_err.response.status_code}
+        return {"path": path, "error": f"HTTP error for path '{path}': {http_err}",
+                "status_code": http_err.response.status_code}
     except Exception as e:
+        return {"path": path, "error": f"An unexpected error occurred: {type(e).__name__} - {e}"}
+
+@mcp.tool()
+@instrument_tool
+async def get_file_content(path: str = 'README.md', owner: str | None = None, repo: str | None = None,
+                           ctx: Context | None = None) -> dict:
+    """Retrieves file content (default: from the configured repo). Respects outbound GitHub rate limits."""
+    print(f"Tool 'get_file_content' called with path: {path}")
+    try:
+        base_url = repo_api_url(owner, repo)
+        await report_progress(ctx, 0, 1, f"Fetching '{path}'")
+        result = await fetch_file(base_url, path)
+        await report_progress(ctx, 1, 1, f"Fetched '{path}'")
+    except asyncio.CancelledError:
+        print(f"Tool 'get_file_content' cancelled by the client (path: {path}).")
+        raise
+    except ValueError as e:
         return {"error": f"An unexpected error occurred: {type(e).__name__} - {e}"}
+    if "error" in result:
+        del result["path"]
+    return result
+
+@mcp.tool()
+@instrument_tool
+async def get_file_contents(paths: list[str], owner: str | None = None, repo: str | None = None,
+                            ctx: Context | None = None) -> dict:
+    """
+    Retrieves several files of one repository concurrently. Each file is streamed
+    as a partial result as soon as it arrives; the final result holds all of them.
+    """
+    print(f"Tool 'get_file_contents' called with {len(paths)} path(s)")
+    try:
+        base_url = repo_api_url(owner, repo)
+    except ValueError as e:
+        return {"error": f"An unexpected error occurred: {type(e).__name__} - {e}"}
+    paths = list(dict.fromkeys(paths))
+    semaphore = asyncio.Semaphore(FILE_FETCH_CONCURRENCY)
+
+    async def fetch(path: str) -> dict:
+        async with semaphore:
+            return await fetch_file(base_url, path)
+
+    tasks = [asyncio.ensure_future(fetch(path)) for path in paths]
+    files: dict[str, dict] = {}
+    try:
+        await report_progress(ctx, 0, len(paths), f"Fetching {len(paths)} file(s)")
+        for next_file in asyncio.as_completed(tasks):
+            result = await next_file
+            files[result["path"]] = result
+            await send_partial_result(ctx, "get_file_contents", result)
+            await report_progress(ctx, len(files), len(paths), f"Fetched '{result['path']}'")
+    except asyncio.CancelledError:
+        print(f"Tool 'get_file_contents' cancelled by the client after {len(files)}/{len(paths)} file(s).")
+        raise
+    finally:
+        # Only still-pending fetches are affected; their upstream calls are dropped
+        # unless another caller is waiting on the same URL.
+        for task in tasks:
+            task.cancel()
+    errors = sum(1 for result in files.values() if "error" in result)
+    return {"files": [files[path] for path in paths], "errors": errors}
 
 @mcp.tool()
+@instrument_tool
 def search_docs(keyword: str) -> dict:
     """Searches local files. This tool is not rate-limited."""
     print(f"Tool 'search_documentation' called with keyword: {keyword}")
-    matches = []
-    if not os.path.isdir(DOCS_DIRECTORY):
+    if not DOCS_PACK and not os.path.isdir(DOCS_DIRECTORY):
         return {"error": f"Docs directory '{DOCS_DIRECTORY}' not found."}
-    for filename in os.listdir(DOCS_DIRECTORY):
-        if filename.endswith(".md"):
-            filepath = os.path.join(DOCS_DIRECTORY, filename)
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    if keyword.lower() in content.lower():
-                        snippet = content[:200] + "..." if len(content) > 200 else content
-                        matches.append({"document": filename, "content_snippet": snippet})
-            except Exception as e:
-                print(f"Could not read file {filepath}: {e}")
+    # Served from the inverted index built at startup; no files are read here.
+    matches = docs_index.search(keyword)
     return {"keyword": keyword, "matches_found": len(matches), "results": matches}
 
 
 # --- Server Execution ---
 if __name__ == "__main__":
     print("🚀 Starting FastMCP Server with Outbound GitHub Rate Limiting...")
-    auth_status = "Authenticated" if GITHUB_TOKEN else "Unauthenticated"
-    outbound_limit = 5000 if GITHUB_TOKEN else 1000
+    auth_status = f"Authenticated ({len(GITHUB_TOKENS)} token(s))" if GITHUB_TOKENS != [None] else "Unauthenticated"
     print(f"Running in {auth_status} mode.")
-    print(f"Outbound GitHub API limit set to: {outbound_limit}/hour")
+    print(f"Outbound GitHub API limit set to: {sum(map(outbound_limit, GITHUB_TOKENS))}/hour")
     
     mcp.run(transport="streamable-http")
\ No newline at end of file
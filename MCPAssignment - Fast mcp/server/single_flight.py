@@ -0,0 +1,50 @@
+"""
+Request coalescing ("single flight") for identical in-flight upstream calls.
+
+While a call for a key is running, later callers with the same key await the
+same task instead of starting their own, and all of them get its result (or
+its exception). The key is dropped as soon as the call finishes, so this only
+merges concurrent callers; it never serves stale results. When every caller
+waiting on a call has been cancelled, the call itself is cancelled too, so
+abandoned work does not keep holding upstream capacity.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable]):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield the shared task so one caller being cancelled does not cancel it for the others.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1:
+                # The last caller gave up; nobody needs the result any more. Forget the
+                # task first, so a caller arriving now starts a new call instead of
+                # joining this one and getting its CancelledError.
+                self._forget(key, task)
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,80 @@
+# Copy of MCPAssignment/server/warmup.py, the source of truth. Do not edit it here:
+# change that file and run server/sync_shared_modules.py.
+"""
+Startup warmup and readiness for the tool servers.
+
+A freshly started server has no open upstream connections and cold caches, so
+its first requests are slow. `Warmup` runs a few named steps concurrently in
+the background once the server is up: opening the pooled GitHub connections,
+paging in the docs index, fetching the hot GitHub paths. Until they have
+finished (or `timeout` has passed), `/readyz` answers 503 so a load balancer
+keeps sending traffic to the old, warm instances. `/healthz` only says that
+the process is alive. On shutdown the server reports not ready again, so it
+leaves the rotation while it drains.
+
+A failed step is recorded and does not keep the server out of rotation: it
+serves cold, exactly as it would have without a warmup.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from github_clients import auth_headers
+
+
+class Warmup:
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self.ready = False
+        self.steps: dict[str, Callable[[], Awaitable]] = {}
+        self.results: dict[str, str] = {}
+        self.duration: float | None = None
+
+    def step(self, name: str, func: Callable[[], Awaitable]) -> None:
+        self.steps[name] = func
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, func) for name, func in self.steps.items()))
+        self.duration = round(time.perf_counter() - started, 3)
+        self.ready = True
+        print(f"Warmup finished in {self.duration:.2f}s: "
+              + ", ".join(f"{name} {result}" for name, result in self.results.items()))
+
+    async def _run_step(self, name: str, func: Callable[[], Awaitable]) -> None:
+        try:
+            await asyncio.wait_for(func(), self.timeout)
+            self.results[name] = "ok"
+        except asyncio.TimeoutError:
+            self.results[name] = f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            self.results[name] = f"failed: {type(e).__name__}: {e}"
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "not ready",
+            "warmup": {name: self.results.get(name, "pending") for name in self.steps},
+            "warmup_duration_s": self.duration,
+        }
+
+
+async def open_connections(client: httpx.AsyncClient, url: str, tokens: list[str | None],
+                           connections: int) -> list[tuple[str | None, httpx.Response]]:
+    """
+    Opens up to `connections` pooled keep-alive connections to the host of
+    `url` by GETting it that many times at once, cycling through `tokens` (so
+    every token is used at least once). Point it at a free endpoint such as
+    GitHub's /rate_limit. Returns the (token, response) pairs, whose
+    X-RateLimit-* headers give each token's current quota.
+    """
+    used = [tokens[i % len(tokens)] for i in range(max(connections, len(tokens)))]
+    responses = await asyncio.gather(
+        *(client.get(url, headers=auth_headers(token)) for token in used), return_exceptions=True
+    )
+    pairs = [(token, response) for token, response in zip(used, responses) if isinstance(response, httpx.Response)]
+    if not pairs:
+        raise responses[0]
+    return pairs
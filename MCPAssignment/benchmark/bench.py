@@ -0,0 +1,182 @@
+"""
+Load generator and latency benchmark for the tool servers.
+
+Drives either the FastAPI `/v1/tools` endpoint or the FastMCP `/mcp` endpoint
+with a configurable number of concurrent workers and a weighted mix of tool
+calls, then prints a JSON report: per-tool and overall p50/p95/p99 latency,
+throughput and error rate.
+
+Typical run against the local GitHub mock. The FastAPI server must list the
+bench token in UNLIMITED_CLIENTS (1b32c28cb38c is the fingerprint of "bench"):
+otherwise its hourly request limit and per-client concurrency cap are what
+gets measured.
+
+    python benchmark/mock_github.py --port 9000 --latency-ms 30
+    UNLIMITED_CLIENTS=1b32c28cb38c GITHUB_API_URL=http://127.0.0.1:9000 python server/server.py
+    python benchmark/bench.py --target tools --concurrency 32 --requests 2000 --token bench --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+DEFAULT_URLS = {
+    "tools": "http://127.0.0.1:8000/v1/tools",
+    "mcp": "http://127.0.0.1:8000/mcp",
+}
+
+# Arguments used for each tool; one set is picked at random per call.
+TOOL_ARGUMENTS = {
+    "get_repository": [{}],
+    "get_repositories": [{"repositories": [f"mock/repo-{i}" for i in range(100)]}],
+    "get_file_content": [{"path": "README.md"}, {"path": "src/app.py"}, {"path": "docs/guide.md"}],
+    "get_file_contents": [{"paths": ["README.md", "src/app.py", "docs/guide.md"]}],
+    "search_docs": [{"keyword": "API"}, {"keyword": "token"}, {"keyword": "rate limit"}],
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parses 'get_repository=1,search_docs=3' into tool weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[tuple[float, bool]], elapsed: float) -> dict:
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+# --- Transports ---
+
+async def call_tools_endpoint(client: httpx.AsyncClient, url: str, tool_name: str, args: dict) -> bool:
+    payload = {"tool_calls": [{"id": f"call_{tool_name}", "function": {"name": tool_name, "arguments": json.dumps(args)}}]}
+    response = await client.post(url, json=payload)
+    if response.status_code != 200:
+        return False
+    body = response.json()
+    if "error" in body:
+        return False
+    for out in body.get("tool_outputs") or []:
+        output = out.get("output")
+        result = json.loads(output) if isinstance(output, str) else output
+        if isinstance(result, dict) and "error" in result:
+            return False
+    return True
+
+
+async def call_mcp_endpoint(client, tool_name: str, args: dict) -> bool:
+    result = await client.call_tool(tool_name, args)
+    data = getattr(result, "data", None)
+    return not (isinstance(data, dict) and "error" in data)
+
+
+# --- Load Generation ---
+
+async def run_worker(target: str, url: str, schedule: list[tuple[str, dict]], samples: dict, headers: dict):
+    """Pops calls off the shared schedule until it is empty, timing each one."""
+    if target == "mcp":
+        from fastmcp import Client
+        async with Client(url) as client:
+            await _drain(schedule, samples, lambda name, args: call_mcp_endpoint(client, name, args))
+    else:
+        async with httpx.AsyncClient(headers=headers, timeout=60) as client:
+            await _drain(schedule, samples, lambda name, args: call_tools_endpoint(client, url, name, args))
+
+
+async def _drain(schedule, samples, call):
+    while schedule:
+        tool_name, args = schedule.pop()
+        started = time.perf_counter()
+        try:
+            ok = await call(tool_name, args)
+        except Exception:
+            ok = False
+        samples.setdefault(tool_name, []).append((time.perf_counter() - started, ok))
+
+
+async def run_benchmark(args) -> dict:
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    names = list(weights)
+    schedule = [
+        (name, rng.choice(TOOL_ARGUMENTS.get(name, [{}])))
+        for name in rng.choices(names, weights=[weights[n] for n in names], k=args.requests)
+    ]
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    url = args.url or DEFAULT_URLS[args.target]
+
+    samples: dict[str, list[tuple[float, bool]]] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_worker(args.target, url, schedule, samples, headers) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [sample for tool_samples in samples.values() for sample in tool_samples]
+    return {
+        "target": args.target,
+        "url": url,
+        "concurrency": args.concurrency,
+        "mix": weights,
+        "duration_s": round(elapsed, 3),
+        "overall": summarize(all_samples, elapsed),
+        "tools": {name: summarize(tool_samples, elapsed) for name, tool_samples in sorted(samples.items())},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency/throughput benchmark for the tool servers.")
+    parser.add_argument("--target", choices=["tools", "mcp"], default="tools", help="FastAPI /v1/tools or FastMCP /mcp.")
+    parser.add_argument("--url", help="Endpoint URL (defaults depend on --target).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent workers.")
+    parser.add_argument("--requests", type=int, default=1000, help="Total number of tool calls.")
+    parser.add_argument("--mix", default="get_repository=1,get_file_content=2,search_docs=2",
+                        help="Weighted tool mix, e.g. 'get_repository=1,search_docs=3'.")
+    parser.add_argument("--token", help="Bearer token sent to the server (selects the authenticated limit).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the workload order.")
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout.")
+    parser.add_argument("--max-error-rate", type=float, help="Exit non-zero if the overall error rate is higher.")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit non-zero if the overall p99 latency is higher.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    # Optional thresholds, so the benchmark can gate a deploy.
+    overall = report["overall"]
+    failed = (
+        (args.max_error_rate is not None and overall["error_rate"] > args.max_error_rate)
+        or (args.max_p99_ms is not None and overall["latency_ms"]["p99"] > args.max_p99_ms)
+    )
+    sys.exit(1 if failed else 0)
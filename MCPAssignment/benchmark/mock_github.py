@@ -0,0 +1,233 @@
+"""
+Local mock of the GitHub REST API endpoints used by the tool servers.
+
+Point a server at it with GITHUB_API_URL=http://127.0.0.1:9000 so benchmarks
+measure the servers themselves, not GitHub, and spend no real quota.
+
+Supported endpoints (any owner/repo):
+- GET /repos/{owner}/{repo}                      repository metadata
+- GET /repos/{owner}/{repo}/contents/{path}      base64 JSON, or raw bytes with
+                                                 `Accept: application/vnd.github.raw`
+                                                 (honours `Range`)
+- GET /repos/{owner}/{repo}/git/trees/{ref}      recursive tree listing
+- GET /repos/{owner}/{repo}/tarball/{ref}        gzipped tarball of all files
+- POST /graphql                                  aliased `repository(owner:, name:)`
+                                                 lookups selecting one fragment, as
+                                                 sent by get_repositories; a repo
+                                                 named "missing" is NOT_FOUND
+
+Every response carries ETag and X-RateLimit-* headers (a separate quota per
+Authorization token), and If-None-Match is answered with 304, like the real API. Latency and error rate are configurable.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import random
+import re
+import tarfile
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+# --- Mock Configuration (overridden from the command line) ---
+LATENCY_MS = 20.0
+ERROR_RATE = 0.0
+FILE_SIZE = 4096
+RATE_LIMIT = 5000
+
+FILES = {
+    "README.md": b"# Mock Repository\n\nServed by the local GitHub API mock.\n",
+    "src/app.py": b"print('hello from the mock repository')\n",
+    "docs/guide.md": b"# Guide\n\nThis API provides access to repository information.\n",
+}
+
+app = FastAPI()
+# Authorization header -> {"remaining": n, "reset": t}, one quota per token like GitHub.
+rate_limit_state: dict[str, dict] = {}
+
+
+def file_bytes(path: str) -> bytes:
+    """Known files are fixed; any other path gets FILE_SIZE deterministic bytes."""
+    if path in FILES:
+        return FILES[path]
+    seed = hashlib.sha256(path.encode("utf-8")).hexdigest()
+    line = f"{path} {seed}\n".encode("utf-8")
+    return (line * (FILE_SIZE // len(line) + 1))[:FILE_SIZE]
+
+
+def git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(f"blob {len(data)}\0".encode("ascii") + data).hexdigest()
+
+
+def rate_limit_headers(request: Request, charged: bool) -> dict:
+    quota = rate_limit_state.setdefault(request.headers.get("authorization", ""), {"remaining": RATE_LIMIT, "reset": 0})
+    if time.time() >= quota["reset"]:
+        quota.update(remaining=RATE_LIMIT, reset=time.time() + 3600)
+    if charged:
+        quota["remaining"] = max(0, quota["remaining"] - 1)
+    return {
+        "X-RateLimit-Limit": str(RATE_LIMIT),
+        "X-RateLimit-Remaining": str(quota["remaining"]),
+        "X-RateLimit-Reset": str(int(quota["reset"])),
+    }
+
+
+async def simulate_upstream() -> Response | None:
+    """Sleeps for the configured latency and sometimes fails, like a busy upstream."""
+    if LATENCY_MS > 0:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    if ERROR_RATE > 0 and random.random() < ERROR_RATE:
+        return JSONResponse({"message": "Server Error"}, status_code=502)
+    return None
+
+
+def etag_response(request: Request, body: bytes, media_type: str, status_code: int = 200,
+                  extra_headers: dict | None = None) -> Response:
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, **rate_limit_headers(request, charged=False)})
+    headers = {"ETag": etag, **rate_limit_headers(request, charged=True), **(extra_headers or {})}
+    return Response(body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+@app.get("/rate_limit")
+async def get_rate_limit(request: Request):
+    # Free, like on GitHub: reports the caller's quota without charging it.
+    headers = rate_limit_headers(request, charged=False)
+    core = {"limit": RATE_LIMIT, "remaining": int(headers["X-RateLimit-Remaining"]),
+            "reset": int(headers["X-RateLimit-Reset"])}
+    return JSONResponse({"resources": {"core": core}, "rate": core}, headers=headers)
+
+
+@app.get("/repos/{owner}/{repo}")
+async def get_repo(owner: str, repo: str, request: Request):
+    if (failure := await simulate_upstream()) is not None:
+        return failure
+    body = JSONResponse({
+        "full_name": f"{owner}/{repo}", "description": "Mock repository", "stargazers_count": 42,
+        "forks_count": 7, "html_url": f"https://github.com/{owner}/{repo}",
+    }).body
+    return etag_response(request, body, "application/json")
+
+
+@app.get("/repos/{owner}/{repo}/contents/{path:path}")
+async def get_contents(owner: str, repo: str, path: str, request: Request):
+    if (failure := await simulate_upstream()) is not None:
+        return failure
+    data = file_bytes(path)
+    if request.headers.get("accept") == "application/vnd.github.raw":
+        range_header = request.headers.get("range", "")
+        if range_header.startswith("bytes="):
+            start_text, _, end_text = range_header[len("bytes="):].partition("-")
+            start = int(start_text or 0)
+            end = min(int(end_text) if end_text else len(data) - 1, len(data) - 1)
+            return etag_response(request, data[start:end + 1], "application/octet-stream", 206, {
+                "Content-Range": f"bytes {start}-{end}/{len(data)}", "Accept-Ranges": "bytes",
+            })
+        return etag_response(request, data, "application/octet-stream", extra_headers={"Accept-Ranges": "bytes"})
+    body = JSONResponse({
+        "path": path, "size": len(data), "sha": git_blob_sha(data), "encoding": "base64",
+        "content": base64.b64encode(data).decode("ascii"),
+    }).body
+    return etag_response(request, body, "application/json")
+
+
+@app.get("/repos/{owner}/{repo}/git/trees/{ref}")
+async def get_tree(owner: str, repo: str, ref: str, request: Request):
+    if (failure := await simulate_upstream()) is not None:
+        return failure
+    tree = [{"path": path, "type": "blob", "sha": git_blob_sha(data), "size": len(data)}
+            for path, data in FILES.items()]
+    body = JSONResponse({"sha": hashlib.sha1(ref.encode()).hexdigest(), "tree": tree, "truncated": False}).body
+    return etag_response(request, body, "application/json")
+
+
+@app.get("/repos/{owner}/{repo}/tarball/{ref}")
+async def get_tarball(owner: str, repo: str, ref: str, request: Request):
+    if (failure := await simulate_upstream()) is not None:
+        return failure
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, data in FILES.items():
+            info = tarfile.TarInfo(f"{owner}-{repo}-{ref}/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return etag_response(request, buffer.getvalue(), "application/x-gzip")
+
+
+# --- Fake GraphQL API ---
+
+# Values of the Repository fields the fake GraphQL API knows about.
+GRAPHQL_REPOSITORY_FIELDS = {
+    "nameWithOwner": lambda owner, name: f"{owner}/{name}",
+    "description": lambda owner, name: "Mock repository",
+    "stargazerCount": lambda owner, name: 42,
+    "forkCount": lambda owner, name: 7,
+    "url": lambda owner, name: f"https://github.com/{owner}/{name}",
+    "defaultBranchRef": lambda owner, name: {"name": "main"},
+    "primaryLanguage": lambda owner, name: {"name": "Python"},
+    "issues": lambda owner, name: {"totalCount": 3},
+    "isArchived": lambda owner, name: False,
+    "pushedAt": lambda owner, name: "2024-01-01T00:00:00Z",
+}
+GRAPHQL_ALIAS_PATTERN = re.compile(r"(\w+): repository\(owner: \$(\w+), name: \$(\w+)\)")
+GRAPHQL_FRAGMENT_PATTERN = re.compile(r"fragment \w+ on Repository \{(.*)\}\s*$", re.S)
+
+
+def top_level_fields(selection: str) -> list[str]:
+    """Names of the fields selected at the top level of a selection set."""
+    names, depth = [], 0
+    for token in re.findall(r"\w+|[{}()]", selection):
+        if token in "{(":
+            depth += 1
+        elif token in "})":
+            depth -= 1
+        elif depth == 0:
+            names.append(token)
+    return names
+
+
+@app.post("/graphql")
+async def graphql(request: Request):
+    if (failure := await simulate_upstream()) is not None:
+        return failure
+    payload = await request.json()
+    query, variables = payload.get("query", ""), payload.get("variables") or {}
+    headers = rate_limit_headers(request, charged=True)
+    fragment = GRAPHQL_FRAGMENT_PATTERN.search(query)
+    fields = top_level_fields(fragment.group(1)) if fragment else []
+    unknown = [field for field in fields if field not in GRAPHQL_REPOSITORY_FIELDS]
+    if not fragment or unknown:
+        message = f"Field '{unknown[0]}' doesn't exist on type 'Repository'" if unknown else "Unsupported query"
+        return JSONResponse({"errors": [{"message": message}]}, headers=headers)
+
+    data, errors = {}, []
+    for alias, owner_var, name_var in GRAPHQL_ALIAS_PATTERN.findall(query):
+        owner, name = variables.get(owner_var), variables.get(name_var)
+        if name == "missing":
+            data[alias] = None
+            errors.append({"type": "NOT_FOUND", "path": [alias],
+                           "message": f"Could not resolve to a Repository with the name '{owner}/{name}'."})
+            continue
+        data[alias] = {field: GRAPHQL_REPOSITORY_FIELDS[field](owner, name) for field in fields}
+    body = {"data": data, **({"errors": errors} if errors else {})}
+    return JSONResponse(body, headers=headers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the GitHub REST API.")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS, help="Added delay per request.")
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="Fraction of requests answered with 502.")
+    parser.add_argument("--file-size", type=int, default=FILE_SIZE, help="Size of generated files (bytes).")
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT, help="Hourly quota reported in headers.")
+    args = parser.parse_args()
+
+    LATENCY_MS, ERROR_RATE, FILE_SIZE, RATE_LIMIT = args.latency_ms, args.error_rate, args.file_size, args.rate_limit
+    print(f"Mock GitHub API on http://127.0.0.1:{args.port} (latency {LATENCY_MS}ms, error rate {ERROR_RATE})")
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -1,10 +1,27 @@
 import argparse
 import requests
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 SERVER_URL = "http://127.0.0.1:8000/v1/tools"
 HEADERS = {"Content-Type": "application/json"}
+# Replayed requests rejected with 429 are retried after the server's Retry-After,
+# up to this many times, as long as the wait is at most MAX_RETRY_AFTER seconds.
+MAX_429_RETRIES = 3
+MAX_RETRY_AFTER = 30
+
+# One keep-alive session per thread, so repeated calls reuse their connection.
+_sessions = threading.local()
+
+def get_session():
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+        session.headers.update(HEADERS)
+    return session
 
 # --- Helper Functions ---
 
@@ -32,9 +49,7 @@ def call_tool(tool_name, params=None):
         ]
     }
     try:
-        #response = requests.post(SERVER_URL, headers=HEADERS, json=payload)
-        response = requests.post(SERVER_URL, headers=HEADERS, json=payload)
-        #print(f"response ------------- {response}")
+        response = get_session().post(SERVER_URL, json=payload)
         return response
     except requests.exceptions.ConnectionError as e:
         print(f"Connection Error: Could not connect to the server at {SERVER_URL}.")
@@ -70,6 +85,80 @@ def test_docs_tool():
         print_response("Response for 'search_docs' with keyword 'API'", docs_response)
 
 
+# --- Workload Replay ---
+
+def load_workload(path):
+    """
+    Reads a recorded workload: one JSON object per line, e.g.
+    {"tool": "search_docs", "arguments": {"keyword": "API"}}. Blank lines are skipped.
+    """
+    calls = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                calls.append((entry["tool"], entry.get("arguments") or {}))
+    return calls
+
+def call_batch(batch):
+    """Sends several tool calls in one request; the server runs them concurrently."""
+    payload = {"tool_calls": [
+        {"id": f"call_{index}", "function": {"name": tool, "arguments": json.dumps(arguments)}}
+        for index, (tool, arguments) in batch
+    ]}
+    started = time.perf_counter()
+    try:
+        response = get_session().post(SERVER_URL, json=payload)
+        # A 429 from the server's fair queue says when to come back; wait and retry if it is soon.
+        for _ in range(MAX_429_RETRIES):
+            retry_after = float(response.headers.get("Retry-After", "inf"))
+            if response.status_code != 429 or retry_after > MAX_RETRY_AFTER:
+                break
+            time.sleep(retry_after)
+            response = get_session().post(SERVER_URL, json=payload)
+        response.raise_for_status()
+        outputs = {out["call_id"]: out["output"] for out in response.json()["tool_outputs"]}
+        error = None
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        outputs, error = {}, f"{type(e).__name__}: {e}"
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    results = []
+    for index, (tool, arguments) in batch:
+        output = outputs.get(f"call_{index}")
+        call_error = error or (output.get("error") if isinstance(output, dict) else None)
+        results.append((index, {"tool": tool, "arguments": arguments, "result": output,
+                                "error": call_error, "latency_ms": latency_ms}))
+    return results
+
+def replay_workload(path, concurrency, batch_size, output=None):
+    """
+    Replays a workload file: calls are grouped into requests of `batch_size`
+    tool calls, and up to `concurrency` requests are in flight at once, each
+    thread reusing its own keep-alive session. Prints a throughput summary.
+    """
+    calls = list(enumerate(load_workload(path)))
+    batches = [calls[i:i + batch_size] for i in range(0, len(calls), batch_size)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        indexed = [item for batch_results in pool.map(call_batch, batches) for item in batch_results]
+    elapsed = time.perf_counter() - started
+    results = [result for _, result in sorted(indexed, key=lambda item: item[0])]
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    errors = sum(1 for result in results if result["error"])
+    print(json.dumps({
+        "calls": len(results),
+        "errors": errors,
+        "requests": len(batches),
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+    }, indent=2))
+
+
 # --- Main Execution ---
 
 if __name__ == "__main__":
@@ -77,16 +166,23 @@ if __name__ == "__main__":
     parser.add_argument("--test-all", action="store_true", help="Run all available tests.")
     parser.add_argument("--test-github", action="store_true", help="Run only the GitHub integration tests.")
     parser.add_argument("--test-docs", action="store_true", help="Run only the documentation search test.")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recorded JSONL workload concurrently.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once in --replay mode.")
+    parser.add_argument("--batch-size", type=int, default=10, help="Tool calls sent per request in --replay mode.")
+    parser.add_argument("--output", metavar="FILE", help="Write each replayed call's result to this JSONL file.")
     args = parser.parse_args()
 
-    # Default to --test-all if no arguments are provided
-    if not (args.test_all or args.test_github or args.test_docs):
-        args.test_all = True
+    if args.replay:
+        replay_workload(args.replay, args.concurrency, args.batch_size, args.output)
+    else:
+        # Default to --test-all if no arguments are provided
+        if not (args.test_all or args.test_github or args.test_docs):
+            args.test_all = True
 
-    if args.test_all or args.test_github:
-        test_github_tools()
+        if args.test_all or args.test_github:
+            test_github_tools()
 
-    if args.test_all or args.test_docs:
-        test_docs_tool()
+        if args.test_all or args.test_docs:
+            test_docs_tool()
 
-    print("✅ Client tests finished.")
+        print("✅ Client tests finished.")
@@ -0,0 +1,73 @@
+"""
+Content-addressed local store for repository file contents.
+
+Blobs are stored on disk under their git blob SHA (the same id GitHub reports
+in the git trees API), so a file that did not change between snapshots is
+never downloaded twice and identical files are stored once.
+"""
+
+import hashlib
+import os
+import tarfile
+import tempfile
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Computes the git object id of a blob with the given content."""
+    header = f"blob {len(data)}\0".encode("ascii")
+    return hashlib.sha1(header + data).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.root, sha[:2], sha[2:])
+
+    def has(self, sha: str) -> bool:
+        return os.path.exists(self._path(sha))
+
+    def read(self, sha: str) -> bytes:
+        with open(self._path(sha), "rb") as f:
+            return f.read()
+
+    def write(self, data: bytes) -> str:
+        """Stores a blob (if not already present) and returns its SHA."""
+        sha = git_blob_sha(data)
+        self._store(sha, data)
+        return sha
+
+    def _store(self, sha: str, data: bytes) -> bool:
+        """Writes the blob unless it is already present; returns whether it was new."""
+        path = self._path(sha)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so a reader never sees a partial blob.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return True
+
+    def import_tarball(self, tarball_path: str, prefix: str = "") -> tuple[dict[str, str], int]:
+        """
+        Stores every regular file under `prefix` from a GitHub repository
+        tarball. Returns a {repo path: blob sha} map and the number of blobs
+        that were not stored before. GitHub wraps the tree in a single
+        top-level directory, which is stripped here.
+        """
+        imported, stored = {}, 0
+        with tarfile.open(tarball_path, "r|gz") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                repo_path = member.name.split("/", 1)[1] if "/" in member.name else ""
+                if not repo_path or not repo_path.startswith(prefix):
+                    continue
+                data = archive.extractfile(member).read()
+                sha = imported[repo_path] = git_blob_sha(data)
+                stored += self._store(sha, data)
+        return imported, stored
@@ -0,0 +1,266 @@
+# Shared with the FastMCP server: after editing, run server/sync_shared_modules.py.
+"""
+In-memory inverted index over the markdown files in the docs directory.
+
+The index is built once at startup. Each document is tokenized into lowercase
+word tokens; the postings map every term to the documents and token positions
+where it occurs. Queries are ranked with BM25 and the snippet is taken around
+the first occurrence of the best matching term, so a lookup never touches the
+disk and does not depend on the size of the corpus.
+
+`LiveDocsIndex` keeps the index fresh by polling the directory: only files
+whose mtime and content hash changed are re-tokenized. Each update produces a
+new snapshot that shares all untouched postings with the previous one, so
+queries keep running against the old snapshot until the new one is swapped in.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SNIPPET_LENGTH = 200
+
+# Standard BM25 tuning constants.
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[tuple[str, int]]:
+    """Splits text into (lowercase term, character offset) pairs."""
+    return [(match.group().lower(), match.start()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def read_markdown_file(filepath: str) -> tuple[str, float, str]:
+    """Returns the content, mtime and content hash of a file."""
+    mtime = os.stat(filepath).st_mtime
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    return raw.decode("utf-8"), mtime, hashlib.sha256(raw).hexdigest()
+
+
+@dataclass
+class IndexedDocument:
+    name: str
+    content: str
+    length: int               # number of tokens
+    offsets: list[int]        # character offset of each token, by position
+    terms: frozenset          # distinct terms, used to unindex the document
+    mtime: float = 0.0
+    digest: str = ""
+
+
+class DocsIndex:
+    def __init__(self):
+        self.documents: dict[str, IndexedDocument] = {}
+        # term -> {document name -> token positions}
+        self.postings: dict[str, dict[str, list[int]]] = {}
+        self.total_length = 0
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "DocsIndex":
+        """Reads and indexes every .md file in a directory."""
+        index = cls()
+        if not os.path.isdir(directory):
+            return index
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".md"):
+                continue
+            filepath = os.path.join(directory, filename)
+            try:
+                content, mtime, digest = read_markdown_file(filepath)
+                index.add_document(filename, content, mtime, digest)
+            except Exception as e:
+                print(f"Could not read file {filepath}: {e}")
+        return index
+
+    def add_document(self, name: str, content: str, mtime: float = 0.0, digest: str = "",
+                     copied: set | None = None) -> None:
+        tokens = tokenize(content)
+        positions_by_term: dict[str, list[int]] = {}
+        for position, (term, _) in enumerate(tokens):
+            positions_by_term.setdefault(term, []).append(position)
+        self.documents[name] = IndexedDocument(
+            name, content, len(tokens), [offset for _, offset in tokens],
+            frozenset(positions_by_term), mtime, digest,
+        )
+        self.total_length += len(tokens)
+        for term, positions in positions_by_term.items():
+            self._postings_for_update(term, copied)[name] = positions
+
+    def remove_document(self, name: str, copied: set | None = None) -> None:
+        document = self.documents.pop(name)
+        self.total_length -= document.length
+        for term in document.terms:
+            matches = self._postings_for_update(term, copied)
+            matches.pop(name, None)
+            if not matches:
+                del self.postings[term]
+
+    def _postings_for_update(self, term: str, copied: set | None) -> dict[str, list[int]]:
+        """
+        Returns the postings of a term ready to be modified. When `copied` is
+        given, the dict is copied once first so the previous snapshot is untouched.
+        """
+        matches = self.postings.get(term)
+        if copied is not None and term not in copied:
+            matches = dict(matches) if matches else {}
+            self.postings[term] = matches
+            copied.add(term)
+        elif matches is None:
+            matches = self.postings[term] = {}
+        return matches
+
+    # --- Incremental Updates ---
+
+    def scan_changes(self, directory: str) -> tuple[list[tuple], dict[str, float], list[str]]:
+        """
+        Compares the directory with the indexed documents. Returns the files
+        whose content changed (name, content, mtime, digest), the files whose
+        mtime moved but whose hash did not, and the names that were deleted.
+        """
+        changed, retimed, seen = [], {}, set()
+        filenames = os.listdir(directory) if os.path.isdir(directory) else []
+        for filename in filenames:
+            if not filename.endswith(".md"):
+                continue
+            filepath = os.path.join(directory, filename)
+            try:
+                mtime = os.stat(filepath).st_mtime
+                seen.add(filename)
+                existing = self.documents.get(filename)
+                if existing is not None and existing.mtime == mtime:
+                    continue
+                content, mtime, digest = read_markdown_file(filepath)
+            except FileNotFoundError:
+                seen.discard(filename)
+                continue
+            except Exception as e:
+                print(f"Could not read file {filepath}: {e}")
+                continue
+            if existing is not None and existing.digest == digest:
+                retimed[filename] = mtime
+            else:
+                changed.append((filename, content, mtime, digest))
+        removed = [name for name in self.documents if name not in seen]
+        return changed, retimed, removed
+
+    def with_changes(self, changed: list[tuple], retimed: dict[str, float], removed: list[str]) -> "DocsIndex":
+        """Builds a new snapshot with the changes applied, leaving this one intact."""
+        snapshot = DocsIndex()
+        snapshot.documents = dict(self.documents)
+        snapshot.postings = dict(self.postings)
+        snapshot.total_length = self.total_length
+        copied: set = set()
+        for name in removed:
+            snapshot.remove_document(name, copied)
+        for name, content, mtime, digest in changed:
+            if name in snapshot.documents:
+                snapshot.remove_document(name, copied)
+            snapshot.add_document(name, content, mtime, digest, copied)
+        for name, mtime in retimed.items():
+            snapshot.documents[name] = dataclasses.replace(snapshot.documents[name], mtime=mtime)
+        return snapshot
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        """Returns the documents matching any query term, best BM25 score first."""
+        terms = list(dict.fromkeys(term for term, _ in tokenize(query)))
+        if not terms or not self.documents:
+            return []
+
+        doc_count = len(self.documents)
+        avg_length = self.total_length / doc_count or 1
+        scores: dict[str, float] = {}
+        # For each document, remember the highest-weighted term that matched it.
+        best_term: dict[str, tuple[float, str]] = {}
+
+        for term in terms:
+            matches = self.postings.get(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for name, positions in matches.items():
+                tf = len(positions)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.documents[name].length / avg_length)
+                term_score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                scores[name] = scores.get(name, 0.0) + term_score
+                if term_score > best_term.get(name, (0.0, ""))[0]:
+                    best_term[name] = (term_score, term)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        results = []
+        for name, score in ranked:
+            term = best_term[name][1]
+            results.append({
+                "document": name,
+                "score": round(score, 4),
+                "content_snippet": self._snippet(self.documents[name], self.postings[term][name][0]),
+            })
+        return results
+
+    @staticmethod
+    def _snippet(document: IndexedDocument, position: int) -> str:
+        """Cuts a window of the content centred on the token at `position`."""
+        content = document.content
+        center = document.offsets[position]
+        start = max(0, center - SNIPPET_LENGTH // 2)
+        end = min(len(content), start + SNIPPET_LENGTH)
+        start = max(0, end - SNIPPET_LENGTH)
+        snippet = content[start:end]
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(content):
+            snippet = snippet + "..."
+        return snippet
+
+
+class LiveDocsIndex:
+    """Holds the current index snapshot and keeps it in sync with the directory."""
+
+    def __init__(self, directory: str, on_change: Callable[[], None] | None = None):
+        self.directory = directory
+        self.current = DocsIndex()
+        # Called (from the refreshing thread) after documents were added, changed or removed.
+        self.on_change = on_change
+        self._refresh_lock = threading.Lock()
+
+    def load(self) -> None:
+        self.current = DocsIndex.from_directory(self.directory)
+
+    def __len__(self) -> int:
+        return len(self.current.documents)
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        return self.current.search(query, limit)
+
+    def refresh(self) -> bool:
+        """Re-indexes only the changed files. Returns True if a new snapshot was published."""
+        with self._refresh_lock:
+            snapshot = self.current
+            changed, retimed, removed = snapshot.scan_changes(self.directory)
+            if not (changed or retimed or removed):
+                return False
+            # Swapping the reference is atomic; in-flight queries finish on the old snapshot.
+            self.current = snapshot.with_changes(changed, retimed, removed)
+            if changed or removed:
+                print(f"Re-indexed docs: {len(changed)} added/changed, {len(removed)} removed.")
+                if self.on_change is not None:
+                    self.on_change()
+            return True
+
+    async def watch(self, interval: float) -> None:
+        """Polls the directory every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Docs re-indexing failed: {e}")
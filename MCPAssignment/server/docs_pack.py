@@ -0,0 +1,216 @@
+# Shared with the FastMCP server: after editing, run server/sync_shared_modules.py.
+"""
+Packed, memory-mapped docs store for large corpora.
+
+At build time the docs directory is indexed once and written to a single file:
+
+    header   magic, document / term counts, total token count, table offsets
+    blobs    document names and raw UTF-8 contents
+    postings per term, one (document id, term frequency, byte offset of the
+             first occurrence) record per matching document
+    docs     fixed-size records: name and content offsets, token count, mtime, digest
+    terms    fixed-size records sorted by term: term offset, postings offset, doc frequency
+
+At run time the file is mmap'ed read-only. A query binary-searches the terms
+table, scores the postings with BM25 and cuts snippets straight out of the
+mapped contents; nothing is decoded or copied except the snippet windows. Every
+worker process that opens the same pack shares one copy in the OS page cache.
+
+Build a pack with:
+
+    python server/docs_pack.py docs docs.pack
+"""
+
+import argparse
+import bisect
+import math
+import mmap
+import struct
+
+from docs_index import BM25_B, BM25_K1, SNIPPET_LENGTH, DocsIndex, tokenize
+
+MAGIC = b"MCPDOCS1"
+HEADER = struct.Struct("<8sIIQQQ")       # magic, doc count, term count, total tokens, docs offset, terms offset
+DOC_ENTRY = struct.Struct("<QIQQId32s")  # name offset/len, content offset/len, tokens, mtime, sha256
+TERM_ENTRY = struct.Struct("<QIQI")      # term offset/len, postings offset, doc frequency
+POSTING = struct.Struct("<III")          # doc id, term frequency, first byte offset
+
+
+def _byte_offsets(content: str, char_offsets: list[int]) -> dict[int, int]:
+    """Maps character offsets in `content` to UTF-8 byte offsets in one pass."""
+    mapping, char_pos, byte_pos = {}, 0, 0
+    for offset in sorted(set(char_offsets)):
+        byte_pos += len(content[char_pos:offset].encode("utf-8"))
+        char_pos = offset
+        mapping[offset] = byte_pos
+    return mapping
+
+
+def build_pack(directory: str, output_path: str) -> int:
+    """Indexes the .md files in `directory` and writes the pack. Returns the document count."""
+    index = DocsIndex.from_directory(directory)
+    names = list(index.documents)
+    doc_ids = {name: i for i, name in enumerate(names)}
+    first_offsets: dict[str, dict[int, int]] = {}
+    for name, document in index.documents.items():
+        needed = [document.offsets[positions[0]] for positions in
+                  (index.postings[term][name] for term in document.terms)]
+        first_offsets[name] = _byte_offsets(document.content, needed)
+
+    with open(output_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+
+        doc_records = []
+        for name in names:
+            document = index.documents[name]
+            name_bytes, content_bytes = name.encode("utf-8"), document.content.encode("utf-8")
+            name_offset = f.tell()
+            f.write(name_bytes)
+            content_offset = f.tell()
+            f.write(content_bytes)
+            doc_records.append(DOC_ENTRY.pack(
+                name_offset, len(name_bytes), content_offset, len(content_bytes),
+                document.length, document.mtime, bytes.fromhex(document.digest),
+            ))
+
+        term_records = []
+        for term in sorted(index.postings, key=lambda t: t.encode("utf-8")):
+            term_bytes = term.encode("utf-8")
+            term_offset = f.tell()
+            f.write(term_bytes)
+            f.write(b"\0" * (-f.tell() % 4))
+            postings_offset = f.tell()
+            matches = index.postings[term]
+            for name, positions in matches.items():
+                char_offset = index.documents[name].offsets[positions[0]]
+                f.write(POSTING.pack(doc_ids[name], len(positions), first_offsets[name][char_offset]))
+            term_records.append(TERM_ENTRY.pack(term_offset, len(term_bytes), postings_offset, len(matches)))
+
+        docs_offset = f.tell()
+        f.write(b"".join(doc_records))
+        terms_offset = f.tell()
+        f.write(b"".join(term_records))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(names), len(term_records), index.total_length, docs_offset, terms_offset))
+    return len(names)
+
+
+class PackedDocsIndex:
+    """Read-only BM25 search over a memory-mapped docs pack."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._view = memoryview(b"")
+        self.doc_count = self.term_count = self.total_length = 0
+
+    def load(self) -> None:
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, self.doc_count, self.term_count, self.total_length, self._docs_offset, self._terms_offset = (
+            HEADER.unpack_from(self._view, 0)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"'{self.path}' is not a docs pack.")
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def prefetch(self) -> None:
+        """Asks the OS to read the whole pack into the page cache ahead of the first queries."""
+        if hasattr(mmap, "MADV_WILLNEED"):
+            self._map.madvise(mmap.MADV_WILLNEED)
+
+    def _document(self, doc_id: int) -> tuple:
+        return DOC_ENTRY.unpack_from(self._view, self._docs_offset + doc_id * DOC_ENTRY.size)
+
+    def _term_bytes(self, i: int) -> bytes:
+        term_offset, term_length, _, _ = TERM_ENTRY.unpack_from(self._view, self._terms_offset + i * TERM_ENTRY.size)
+        return self._view[term_offset:term_offset + term_length].tobytes()
+
+    def _postings(self, term: str):
+        """Returns the (doc id, tf, first byte offset) records of a term, or None."""
+        target = term.encode("utf-8")
+        terms = _TermKeys(self)
+        i = bisect.bisect_left(terms, target)
+        if i == self.term_count or terms[i] != target:
+            return None
+        _, _, postings_offset, doc_freq = TERM_ENTRY.unpack_from(self._view, self._terms_offset + i * TERM_ENTRY.size)
+        return doc_freq, POSTING.iter_unpack(self._view[postings_offset:postings_offset + doc_freq * POSTING.size])
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        """Same ranking and result shape as DocsIndex.search."""
+        terms = list(dict.fromkeys(term for term, _ in tokenize(query)))
+        if not terms or not self.doc_count:
+            return []
+
+        avg_length = self.total_length / self.doc_count or 1
+        scores: dict[int, float] = {}
+        best_term: dict[int, tuple[float, int]] = {}  # doc id -> (term score, first byte offset)
+        lengths: dict[int, int] = {}
+
+        for term in terms:
+            found = self._postings(term)
+            if found is None:
+                continue
+            doc_freq, postings = found
+            idf = math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for doc_id, tf, first_byte in postings:
+                length = lengths.get(doc_id)
+                if length is None:
+                    length = lengths[doc_id] = self._document(doc_id)[4]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                term_score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + term_score
+                if term_score > best_term.get(doc_id, (0.0, 0))[0]:
+                    best_term[doc_id] = (term_score, first_byte)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        results = []
+        for doc_id, score in ranked:
+            name_offset, name_length, content_offset, content_length, *_ = self._document(doc_id)
+            results.append({
+                "document": self._view[name_offset:name_offset + name_length].tobytes().decode("utf-8"),
+                "score": round(score, 4),
+                "content_snippet": self._snippet(content_offset, content_length, best_term[doc_id][1]),
+            })
+        return results
+
+    def _snippet(self, content_offset: int, content_length: int, center: int) -> str:
+        """Decodes only the window around `center`; a character cut at the edges is dropped."""
+        start = max(0, center - SNIPPET_LENGTH // 2)
+        end = min(content_length, start + SNIPPET_LENGTH)
+        start = max(0, end - SNIPPET_LENGTH)
+        window = self._view[content_offset + start:content_offset + end]
+        snippet = str(window, "utf-8", "ignore")
+        if start > 0:
+            snippet = "..." + snippet
+        if end < content_length:
+            snippet = snippet + "..."
+        return snippet
+
+
+class _TermKeys:
+    """Sequence view of the sorted terms table, so bisect can search it in place."""
+
+    def __init__(self, index: PackedDocsIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index.term_count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._index._term_bytes(i)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack a docs directory into a memory-mappable search file.")
+    parser.add_argument("directory", help="Directory with the .md files.")
+    parser.add_argument("output", help="Pack file to write, e.g. docs.pack.")
+    args = parser.parse_args()
+    count = build_pack(args.directory, args.output)
+    print(f"Packed {count} documents from '{args.directory}' into '{args.output}'.")
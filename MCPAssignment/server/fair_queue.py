@@ -0,0 +1,192 @@
+"""
+Weighted fair queuing of tool calls across clients.
+
+Every client (API token or IP) gets its own FIFO queue. At most `capacity`
+tool calls run server-wide and at most `client_concurrency` per client. When a
+slot frees up, it goes to the waiting call with the smallest virtual finish
+tag (start-time fair queuing): a call's tag is
+
+    max(virtual time, the client's previous tag) + 1 / weight
+
+so each backlogged client is served in proportion to its weight, however many
+calls it has queued. The weight comes from the client's priority class. A
+client that floods the server only lengthens its own queue. A request
+reserves room for all of its calls in that queue when it is admitted, so
+requests arriving together cannot overfill it. Once the queue holds
+`client_queue` calls, new requests are rejected with FairQueueFull, which
+carries how long until the queue has room again. A request admitted as
+`unlimited` (e.g. from a load generator) skips both per-client caps and is
+bounded by `capacity` alone.
+
+Picking the next call scans the clients with queued calls, O(active clients).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+PRIORITY_WEIGHTS = {"high": 4.0, "normal": 2.0, "low": 1.0}
+
+
+class FairQueueFull(Exception):
+    def __init__(self, message: str, retry_after: int, priority: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.priority = priority
+
+
+class _ClientQueue:
+    def __init__(self, weight: float, concurrency: int):
+        self.weight = weight
+        self.concurrency = concurrency
+        self.waiters: deque[tuple[float, asyncio.Future]] = deque()
+        # Calls of admitted requests that have not reached slot() yet.
+        self.reserved = 0
+        self.running = 0
+        self.finish_tag = 0.0
+
+
+class Reservation:
+    """Room in a client's queue held for the calls of one admitted request."""
+
+    def __init__(self, calls: int):
+        self.remaining = calls
+
+
+class FairScheduler:
+    def __init__(self, capacity: int, client_concurrency: int, client_queue: int,
+                 weights: dict[str, float] | None = None):
+        self.capacity = capacity
+        self.client_concurrency = client_concurrency
+        self.client_queue = client_queue
+        self.weights = weights or PRIORITY_WEIGHTS
+        self.running = 0
+        self.virtual_time = 0.0
+        # Running average of how long a call holds its slot, for Retry-After estimates.
+        self.service_time = 0.1
+        self._clients: dict[str, _ClientQueue] = {}
+
+    def weight(self, priority: str) -> float:
+        return self.weights.get(priority, self.weights["normal"])
+
+    def _client(self, key: str, priority: str) -> _ClientQueue:
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _ClientQueue(self.weight(priority), self.client_concurrency)
+        client.weight = self.weight(priority)
+        return client
+
+    def queued(self, key: str) -> int:
+        client = self._clients.get(key)
+        return len(client.waiters) + client.reserved if client else 0
+
+    @property
+    def waiting(self) -> int:
+        """Calls queued across all clients."""
+        return sum(len(client.waiters) for client in self._clients.values())
+
+    # --- Admission ---
+
+    @contextmanager
+    def admit(self, key: str, priority: str, calls: int, unlimited: bool = False):
+        """
+        Reserves room for `calls` calls in the client's queue and yields the
+        Reservation, which the request's slot() calls use up. Raises
+        FairQueueFull if they do not fit. Callers must reject batches larger
+        than `client_queue` beforehand, since those never fit. An `unlimited`
+        client is always admitted and may use every slot.
+        """
+        queued = self.queued(key)
+        if not unlimited and queued + calls > self.client_queue:
+            retry_after = self.retry_after(key, priority, queued + calls - self.client_queue)
+            raise FairQueueFull(
+                f"Too many queued tool calls for this client ({queued} waiting, limit {self.client_queue}). "
+                f"Retry in {retry_after}s.",
+                retry_after, priority,
+            )
+        client = self._client(key, priority)
+        client.concurrency = self.capacity if unlimited else self.client_concurrency
+        reservation = Reservation(calls)
+        client.reserved += calls
+        try:
+            yield reservation
+        finally:
+            # Calls that never reached slot(), e.g. because the request was cancelled.
+            client.reserved -= reservation.remaining
+            reservation.remaining = 0
+            self._forget(key, client)
+
+    def retry_after(self, key: str, priority: str, calls: int) -> int:
+        """Seconds until `calls` of the client's queued calls have started, at its fair share."""
+        weight = self.weight(priority)
+        active_weight = sum(
+            client.weight for k, client in self._clients.items()
+            if k != key and (client.waiters or client.reserved or client.running)
+        ) + weight
+        slots = min(self.client_concurrency, self.capacity * weight / active_weight)
+        return max(1, math.ceil(calls * self.service_time / slots))
+
+    # --- Scheduling ---
+
+    @asynccontextmanager
+    async def slot(self, key: str, priority: str, reservation: Reservation | None = None):
+        """
+        Waits for the client's turn and holds one execution slot while the
+        block runs. A call admitted with a Reservation uses up one of its places.
+        """
+        client = self._client(key, priority)
+        if reservation is not None and reservation.remaining:
+            reservation.remaining -= 1
+            client.reserved -= 1
+        tag = max(self.virtual_time, client.finish_tag) + 1 / client.weight
+        client.finish_tag = tag
+        future = asyncio.get_running_loop().create_future()
+        client.waiters.append((tag, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(key, client, None)  # the slot was granted just as the caller gave up
+            else:
+                client.waiters = deque(w for w in client.waiters if w[1] is not future)
+                self._forget(key, client)
+            raise
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(key, client, time.perf_counter() - started)
+
+    def _dispatch(self) -> None:
+        while self.running < self.capacity:
+            eligible = [
+                client for client in self._clients.values()
+                if client.waiters and client.running < client.concurrency
+            ]
+            if not eligible:
+                return
+            client = min(eligible, key=lambda c: c.waiters[0][0])
+            tag, future = client.waiters.popleft()
+            if future.done():
+                continue  # its caller was cancelled and has not cleaned up yet
+            self.virtual_time = max(self.virtual_time, tag - 1 / client.weight)
+            client.running += 1
+            self.running += 1
+            future.set_result(None)
+
+    def _release(self, key: str, client: _ClientQueue, elapsed: float | None) -> None:
+        client.running -= 1
+        self.running -= 1
+        if elapsed is not None:
+            self.service_time += 0.2 * (elapsed - self.service_time)
+        self._forget(key, client)
+        self._dispatch()
+
+    def _forget(self, key: str, client: _ClientQueue) -> None:
+        # Idle clients are dropped, so memory stays bounded by the active ones. A
+        # returning client starts again at the current virtual time.
+        if not client.waiters and not client.reserved and not client.running:
+            self._clients.pop(key, None)
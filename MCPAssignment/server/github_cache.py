@@ -0,0 +1,141 @@
+# Shared with the FastMCP server: after editing, run server/sync_shared_modules.py.
+"""
+Conditional-request cache for GitHub API responses.
+
+Responses are stored by URL together with their ETag / Last-Modified headers.
+The next request for the same URL is sent with If-None-Match / If-Modified-Since,
+and a 304 answer (which GitHub does not count against the rate limit) is served
+from the cache.
+
+- Memory tier: an LRU bounded by the total size of the cached bodies.
+- Disk tier (optional): one JSON file per URL, so the cache survives restarts.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass
+class CacheEntry:
+    etag: str | None
+    last_modified: str | None
+    content_type: str | None
+    content: bytes
+
+
+class GitHubResponseCache:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- Public API ---
+
+    async def get(self, url: str) -> CacheEntry | None:
+        """Returns the cached entry for a URL, falling back to the disk tier."""
+        entry = self._get_from_memory(url)
+        if entry is None and self.disk_dir:
+            entry = await asyncio.to_thread(self._read_from_disk, url)
+            if entry is not None:
+                self._put_in_memory(url, entry)
+        return entry
+
+    async def put(self, url: str, response: httpx.Response) -> None:
+        """Caches a successful response if GitHub gave us a validator for it."""
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        entry = CacheEntry(etag, last_modified, response.headers.get("content-type"), response.content)
+        self._put_in_memory(url, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_to_disk, url, entry)
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict:
+        """Builds the revalidation headers for a cached entry."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    @staticmethod
+    def build_response(entry: CacheEntry, request: httpx.Request, cache_status: str = "revalidated") -> httpx.Response:
+        """Turns a cached entry back into a 200 response for the caller."""
+        headers = {"X-Cache": cache_status}
+        if entry.content_type:
+            headers["Content-Type"] = entry.content_type
+        if entry.etag:
+            headers["ETag"] = entry.etag
+        return httpx.Response(200, content=entry.content, headers=headers, request=request)
+
+    # --- Memory Tier (LRU bounded by total body size) ---
+
+    def _get_from_memory(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def _put_in_memory(self, url: str, entry: CacheEntry) -> None:
+        size = len(entry.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._entries[url] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+
+    # --- Disk Tier ---
+
+    def _disk_path(self, url: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_from_disk(self, url: str) -> CacheEntry | None:
+        try:
+            with open(self._disk_path(url), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return CacheEntry(
+                data.get("etag"), data.get("last_modified"), data.get("content_type"),
+                base64.b64decode(data["content"]),
+            )
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+            return None
+
+    def _write_to_disk(self, url: str, entry: CacheEntry) -> None:
+        path = self._disk_path(url)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": url,
+                    "etag": entry.etag,
+                    "last_modified": entry.last_modified,
+                    "content_type": entry.content_type,
+                    "content": base64.b64encode(entry.content).decode("ascii"),
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write cache file {path}: {e}")
@@ -0,0 +1,115 @@
+# Shared with the FastMCP server: after editing, run server/sync_shared_modules.py.
+"""
+Connection pools and token rotation for serving many GitHub repositories.
+
+- HostClients: one long-lived httpx.AsyncClient per host (api.github.com,
+  codeload.github.com, a GitHub Enterprise host, ...). Requests for any
+  repository on a host share that host's keep-alive / HTTP/2 connections.
+- TokenRotation: several tokens, each with its own quota as last reported by
+  GitHub's X-RateLimit-* headers. Every request goes out with the token that
+  has the most quota left, so a deployment gets the sum of its tokens' budgets.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+import httpx
+
+WINDOW_SECONDS = 3600
+
+
+def parse_tokens(tokens: str | None, token: str | None = None) -> list[str | None]:
+    """
+    Reads the comma-separated GITHUB_TOKENS, falling back to the single
+    GITHUB_TOKEN. Returns [None] (unauthenticated) when neither is set.
+    """
+    parsed = [item.strip() for item in (tokens or "").split(",") if item.strip()]
+    if not parsed and token:
+        parsed = [token]
+    return parsed or [None]
+
+
+def token_fingerprint(token: str | None) -> str:
+    """A short, stable, non-secret name for a token, for file names and logs."""
+    if token is None:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:12]
+
+
+def auth_headers(token: str | None) -> dict:
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+class HostClients:
+    def __init__(self, **client_kwargs):
+        self._client_kwargs = client_kwargs
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Returns the pooled client for the URL's host, creating it on first use."""
+        parsed = httpx.URL(url)
+        host = f"{parsed.scheme}://{parsed.netloc.decode('ascii')}"
+        client = self._clients.get(host)
+        if client is None:
+            client = self._clients[host] = httpx.AsyncClient(**self._client_kwargs)
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+@dataclass
+class TokenQuota:
+    limit: int
+    remaining: int
+    reset_at: float
+    blocked_until: float = 0.0
+
+    def available(self, now: float) -> int:
+        if self.blocked_until > now:
+            return 0
+        return self.limit if self.reset_at <= now else self.remaining
+
+
+class TokenRotation:
+    def __init__(self, tokens: list[str | None]):
+        now = time.time()
+        self.quotas = {
+            token: TokenQuota(5000 if token else 1000, 5000 if token else 1000, now + WINDOW_SECONDS)
+            for token in tokens
+        }
+
+    def choose(self) -> str | None:
+        """
+        Picks the token with the most quota left and counts one request against
+        it right away, so concurrent callers spread over the tokens instead of
+        all picking the same one before GitHub's headers come back.
+        """
+        now = time.time()
+        token, quota = max(self.quotas.items(), key=lambda item: item[1].available(now))
+        if quota.reset_at <= now:
+            quota.remaining, quota.reset_at = quota.limit, now + WINDOW_SECONDS
+        quota.remaining = max(0, quota.remaining - 1)
+        return token
+
+    def update(self, token: str | None, headers: httpx.Headers) -> None:
+        """Replaces the token's estimate with GitHub's own view of its quota."""
+        quota = self.quotas.get(token)
+        if quota is None or "x-ratelimit-remaining" not in headers:
+            return
+        quota.remaining = int(headers["x-ratelimit-remaining"])
+        quota.limit = int(headers.get("x-ratelimit-limit", quota.limit))
+        quota.reset_at = float(headers.get("x-ratelimit-reset", quota.reset_at))
+
+    def block(self, token: str | None, seconds: float) -> None:
+        """Skips a token for `seconds`, e.g. after GitHub rejected it with a secondary limit."""
+        quota = self.quotas.get(token)
+        if quota is not None:
+            quota.blocked_until = max(quota.blocked_until, time.time() + seconds)
+
+    def remaining(self) -> int:
+        now = time.time()
+        return sum(quota.available(now) for quota in self.quotas.values())
@@ -0,0 +1,88 @@
+"""
+Batched repository metadata lookups through GitHub's GraphQL API.
+
+One query fetches many repositories: each one is an aliased `repository(...)`
+field (`r0`, `r1`, ...) that selects the same fragment, so the response holds
+only the requested fields. Owners and names are passed as variables, never
+pasted into the query text.
+
+Repositories GitHub cannot resolve come back as null with a NOT_FOUND error
+naming their alias; they are reported per repository instead of failing the
+whole batch. An error without a path (e.g. RATE_LIMITED) concerns the whole
+query and is raised as GraphQLError.
+"""
+
+
+class GraphQLError(Exception):
+    pass
+
+
+# Tool field name -> (GraphQL selection, how to read it from the repository node).
+REPOSITORY_FIELDS = {
+    "name": ("nameWithOwner", lambda node: node.get("nameWithOwner")),
+    "description": ("description", lambda node: node.get("description")),
+    "stars": ("stargazerCount", lambda node: node.get("stargazerCount")),
+    "forks": ("forkCount", lambda node: node.get("forkCount")),
+    "url": ("url", lambda node: node.get("url")),
+    "default_branch": ("defaultBranchRef { name }", lambda node: (node.get("defaultBranchRef") or {}).get("name")),
+    "language": ("primaryLanguage { name }", lambda node: (node.get("primaryLanguage") or {}).get("name")),
+    "open_issues": ("issues(states: OPEN) { totalCount }", lambda node: (node.get("issues") or {}).get("totalCount")),
+    "archived": ("isArchived", lambda node: node.get("isArchived")),
+    "pushed_at": ("pushedAt", lambda node: node.get("pushedAt")),
+}
+# The same fields (and names) get_repository returns.
+DEFAULT_FIELDS = ("name", "description", "stars", "forks", "url")
+
+
+def split_repository(full_name: str) -> tuple[str, str]:
+    owner, _, name = full_name.strip().partition("/")
+    if not owner or not name or "/" in name:
+        raise ValueError(f"Repository '{full_name}' is not in 'owner/name' form.")
+    return owner, name
+
+
+def build_query(repositories: list[str], fields: list[str]) -> tuple[str, dict]:
+    """Builds the query text and variables for one batch of 'owner/name' repositories."""
+    selections = " ".join(REPOSITORY_FIELDS[field][0] for field in fields)
+    parameters, aliases, variables = [], [], {}
+    for i, full_name in enumerate(repositories):
+        owner, name = split_repository(full_name)
+        variables[f"owner{i}"], variables[f"name{i}"] = owner, name
+        parameters.append(f"$owner{i}: String!, $name{i}: String!")
+        aliases.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepositoryFields }}")
+    query = (
+        f"query ({', '.join(parameters)}) {{ {' '.join(aliases)} }} "
+        f"fragment RepositoryFields on Repository {{ {selections} }}"
+    )
+    return query, variables
+
+
+def parse_response(repositories: list[str], fields: list[str], body: dict) -> list[dict]:
+    """
+    Turns a GraphQL response into one result (or error) per requested
+    repository. A failed repository carries the GraphQL `error_type`.
+    """
+    data = body.get("data") or {}
+    errors_by_alias = {}
+    for error in body.get("errors") or []:
+        path = error.get("path") or []
+        if not path:
+            raise GraphQLError(f"{error.get('type', 'ERROR')}: {error.get('message', 'Unknown error')}")
+        errors_by_alias[path[0]] = error
+
+    results = []
+    for i, full_name in enumerate(repositories):
+        node = data.get(f"r{i}")
+        if node is None:
+            error = errors_by_alias.get(f"r{i}", {"type": "NOT_FOUND", "message": "Repository not found."})
+            results.append({
+                "repository": full_name,
+                "error": error.get("message", "Unknown error"),
+                "error_type": error.get("type", "UNKNOWN"),
+            })
+            continue
+        result = {"repository": full_name}
+        for field in fields:
+            result[field] = REPOSITORY_FIELDS[field][1](node)
+        results.append(result)
+    return results
@@ -0,0 +1,104 @@
+"""
+ASGI middleware that compresses large JSON responses.
+
+The encoding is negotiated from the request's Accept-Encoding: zstd when the
+optional `zstandard` package is installed and the client accepts it,
+otherwise gzip. Only JSON bodies of at least `minimum_size` bytes are
+compressed. Streamed responses (e.g. raw file downloads with byte ranges) are
+passed through untouched, so Content-Range stays correct. Bodies of at least
+`offload_size` bytes are compressed in a worker thread, so a large response
+does not stall the event loop for every other request.
+"""
+
+import asyncio
+import gzip
+import threading
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available.
+    zstandard = None
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(coding.strip().lower())
+    if zstandard is not None and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, offload_size: int = 65536,
+                 gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        # A ZstdCompressor must not be shared between threads, so each one gets its own.
+        self._local = threading.local()
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "zstd":
+            compressor = getattr(self._local, "zstd", None)
+            if compressor is None:
+                compressor = self._local.zstd = zstandard.ZstdCompressor(level=self.zstd_level)
+            return compressor.compress(body)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        body_parts = []
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    not headers.get("content-type", "").startswith("application/json")
+                    or "content-encoding" in headers
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(body_parts)
+            if len(body) >= self.minimum_size:
+                if len(body) >= self.offload_size:
+                    body = await asyncio.to_thread(self.compress, body, encoding)
+                else:
+                    body = self.compress(body, encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,110 @@
+"""
+Result cache for deterministic tool calls.
+
+Results are keyed by tool name and a canonical form of the arguments (JSON
+with sorted keys), so `{"a": 1, "b": 2}` and `{"b": 2, "a": 1}` share an entry.
+Only tools with a configured TTL are cached, and error results never are.
+
+- Memory bound: an LRU limited by the total size of the serialized results.
+- Invalidation: `invalidate(tool)` drops one tool's entries (e.g. `search_docs`
+  when the docs watcher re-indexes), `invalidate()` drops everything. Each
+  invalidation also bumps the tool's generation: a caller captures
+  `generation(tool)` before running the tool and passes it to `put()`, which
+  drops the result if an invalidation happened meanwhile. A call that read the
+  old docs snapshot therefore cannot re-cache its stale result.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import orjson
+
+
+@dataclass
+class CachedResult:
+    tool: str
+    result: object
+    size: int
+    expires_at: float
+
+
+def argument_key(tool: str, arguments: dict) -> str:
+    """Hashes a tool name and its arguments, independent of argument order."""
+    canonical = orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+    return tool + ":" + hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class ToolResultCache:
+    def __init__(self, ttls: dict[str, float], max_bytes: int = 16 * 1024 * 1024):
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._size = 0
+        self._generations: dict[str, int] = {}
+        self._generation_all = 0
+        # Invalidation can come from the docs watcher thread as well as the event loop.
+        self._lock = threading.Lock()
+
+    def enabled_for(self, tool: str) -> bool:
+        return self.ttls.get(tool, 0) > 0
+
+    def get(self, key: str):
+        """Returns the cached result for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.result
+
+    def generation(self, tool: str) -> int:
+        """Grows with every invalidation that covers `tool`."""
+        with self._lock:
+            return self._generation_all + self._generations.get(tool, 0)
+
+    def put(self, tool: str, key: str, result, generation: int | None = None) -> None:
+        """
+        Caches a successful result for the tool's TTL, unless the tool was
+        invalidated after `generation` was captured.
+        """
+        ttl = self.ttls.get(tool, 0)
+        if ttl <= 0 or (isinstance(result, dict) and "error" in result):
+            return
+        size = len(orjson.dumps(result))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation_all + self._generations.get(tool, 0):
+                return
+            self._remove(key)
+            self._entries[key] = CachedResult(tool, result, size, time.monotonic() + ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def invalidate(self, tool: str | None = None) -> int:
+        """Drops the entries of one tool (or of all tools). Returns how many were dropped."""
+        with self._lock:
+            if tool is None:
+                self._generation_all += 1
+            else:
+                self._generations[tool] = self._generations.get(tool, 0) + 1
+            keys = [key for key, entry in self._entries.items() if tool is None or entry.tool == tool]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
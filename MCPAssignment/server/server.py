@@ -1,11 +1,36 @@
 import os
 import base64
-import requests
-import json
+import hashlib
+import hmac
+import orjson
+import asyncio
+import math
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs, quote
+import httpx
 from dotenv import load_dotenv
+from github_cache import GitHubResponseCache
+from github_clients import HostClients, TokenRotation, auth_headers, parse_tokens, token_fingerprint
+from github_graphql import (
+    DEFAULT_FIELDS, REPOSITORY_FIELDS, GraphQLError, build_query, parse_response, split_repository,
+)
+from docs_index import LiveDocsIndex
+from docs_pack import PackedDocsIndex
+from blob_store import BlobStore
+from tool_executor import BoundedToolExecutor, ToolExecutorBusy
+from fair_queue import PRIORITY_WEIGHTS, FairQueueFull, FairScheduler
+from warmup import Warmup, open_connections
+from response_compression import CompressionMiddleware
+from tool_registry import ToolArgumentsError, ToolRegistry
+from result_cache import ToolResultCache, argument_key
+import metrics
 
 # --- Imports for FastAPI and Rate Limiting ---
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List
 import uvicorn
@@ -17,80 +42,380 @@ from slowapi.errors import RateLimitExceeded
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Several tokens (comma-separated) are rotated, each request using the one with the most quota left.
+GITHUB_TOKENS = parse_tokens(os.getenv("GITHUB_TOKENS"), GITHUB_TOKEN)
+# Default repository; every GitHub tool also takes optional `owner` / `repo` arguments.
 GITHUB_REPO_OWNER = os.getenv("GITHUB_REPO_OWNER")
 GITHUB_REPO_NAME = os.getenv("GITHUB_REPO_NAME")
 DOCS_DIRECTORY = "docs"
+# Upper bound on how many tool calls from one client (across all its requests) execute
+# at the same time; the rest wait in that client's fair queue.
+MAX_CONCURRENT_TOOL_CALLS = int(os.getenv("MAX_CONCURRENT_TOOL_CALLS", "8"))
+# Weighted fair queuing of tool calls across clients: at most FAIR_QUEUE_CAPACITY calls
+# run server-wide, and a client with FAIR_QUEUE_CLIENT_QUEUE calls waiting gets a 429.
+FAIR_QUEUE_CAPACITY = int(os.getenv("FAIR_QUEUE_CAPACITY", "32"))
+FAIR_QUEUE_CLIENT_QUEUE = int(os.getenv("FAIR_QUEUE_CLIENT_QUEUE", "64"))
+# Clients served in the "high" priority class: API token fingerprints (see
+# github_clients.token_fingerprint) or IP addresses, comma-separated. Other
+# authenticated clients are "normal", anonymous ones "low".
+FAIR_QUEUE_HIGH_PRIORITY_CLIENTS = {
+    client.strip() for client in os.getenv("FAIR_QUEUE_HIGH_PRIORITY_CLIENTS", "").split(",") if client.strip()
+}
+# Clients exempt from the hourly request limits and from the per-client concurrency
+# and queue caps, e.g. a load generator (token fingerprints or IPs, comma-separated).
+# They still share the FAIR_QUEUE_CAPACITY slots with everyone else.
+UNLIMITED_CLIENTS = {
+    client.strip() for client in os.getenv("UNLIMITED_CLIENTS", "").split(",") if client.strip()
+}
+# Sync tools run on a bounded thread pool. Calls beyond workers + queue depth are
+# rejected, and every tool call is cut off after its timeout (seconds).
+TOOL_EXECUTOR_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", "16"))
+TOOL_EXECUTOR_QUEUE_DEPTH = int(os.getenv("TOOL_EXECUTOR_QUEUE_DEPTH", "64"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+# Per-tool overrides, e.g. "get_tree_snapshot=120,search_docs=2".
+TOOL_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (item.partition("=") for item in os.getenv("TOOL_TIMEOUTS", "").split(",") if item)
+}
+# JSON responses at least this large (bytes) are zstd/gzip compressed when the client accepts it.
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Responses at least this large (bytes) are compressed in a worker thread instead of on the event loop.
+COMPRESSION_OFFLOAD_SIZE = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", "65536"))
+# Extra tools imported on first use, as "module:function" paths (comma-separated).
+# Tools installed under the "mcp_tools" entry point group are picked up as well.
+TOOL_MODULES = os.getenv("TOOL_MODULES", "")
+# Results of deterministic tools are cached per tool for these TTLs (seconds);
+# tools without a TTL are never cached. The cache is an LRU bounded in bytes.
+TOOL_CACHE_TTLS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=") for item in os.getenv("TOOL_CACHE_TTLS", "get_repository=60,get_repositories=60,search_docs=300").split(",") if item
+    )
+}
+TOOL_CACHE_MAX_BYTES = int(os.getenv("TOOL_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Shared secret of the GitHub webhook that invalidates cached GitHub results; unset disables the endpoint.
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+# How often (seconds) the docs directory is polled for changes; 0 disables watching.
+DOCS_WATCH_INTERVAL = float(os.getenv("DOCS_WATCH_INTERVAL", "2"))
+# Optional docs pack built with `python server/docs_pack.py docs docs.pack`. When set,
+# search_docs runs on the memory-mapped pack (shared by all workers) and nothing is watched.
+DOCS_PACK = os.getenv("DOCS_PACK")
+
+# Connection pool tuning for the shared GitHub HTTP client.
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "true").lower() == "true"
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "100"))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+GITHUB_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "30"))
+# Explicit upstream timeouts (seconds), so a degraded GitHub cannot hold calls for long.
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "3"))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "10"))
+
+# ETag cache for GitHub responses. Set GITHUB_CACHE_DIR to keep it across restarts.
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR")
 
-if not all([GITHUB_TOKEN, GITHUB_REPO_OWNER, GITHUB_REPO_NAME]):
-    raise ValueError("Missing required environment variables. Please check your .env file.")
+# Startup warmup (see warmup.py): connections opened to GitHub ahead of traffic,
+# hot paths of the default repository fetched into the ETag cache ("/" is the
+# repository itself; empty disables), and how long (seconds) /readyz waits for it.
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+WARMUP_GITHUB_PATHS = [
+    path.strip() for path in os.getenv("WARMUP_GITHUB_PATHS", "/,/contents/README.md").split(",") if path.strip()
+]
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
 
-GITHUB_API_BASE_URL = f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}"
+# Local content-addressed store that tree snapshots are unpacked into.
+BLOB_STORE_DIRECTORY = os.getenv("BLOB_STORE_DIRECTORY", ".blob_store")
+# How long (seconds) get_file_content serves files from a tree snapshot before
+# going back to GitHub; bounds staleness when no webhook is configured.
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", "300"))
+
+# Chunk size (bytes) used when streaming raw file contents to the client.
+FILE_STREAM_CHUNK_SIZE = int(os.getenv("FILE_STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+if GITHUB_TOKENS == [None]:
+    raise ValueError("Missing GITHUB_TOKEN (or GITHUB_TOKENS). Please check your .env file.")
+
+# GITHUB_API_URL can point at a local mock API (see MCPAssignment/benchmark/mock_github.py).
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 GITHUB_HEADERS = {
-    "Authorization": f"Bearer {GITHUB_TOKEN}",
     "Accept": "application/vnd.github.v3+json",
 }
+# GraphQL endpoint used by get_repositories (GitHub Enterprise serves it at /api/graphql).
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+# Repositories fetched per GraphQL query, and the most one get_repositories call may ask for.
+GRAPHQL_BATCH_SIZE = int(os.getenv("GRAPHQL_BATCH_SIZE", "100"))
+GRAPHQL_MAX_REPOSITORIES = int(os.getenv("GRAPHQL_MAX_REPOSITORIES", "1000"))
+
+def repo_api_url(owner: str | None = None, repo: str | None = None) -> str:
+    """
+    Builds the API URL of a repository. `repo` may also be given as "owner/name";
+    missing parts fall back to GITHUB_REPO_OWNER / GITHUB_REPO_NAME.
+    """
+    if owner is None and repo and "/" in repo:
+        owner, repo = repo.split("/", 1)
+    owner, repo = owner or GITHUB_REPO_OWNER, repo or GITHUB_REPO_NAME
+    if not (owner and repo):
+        raise ValueError("No repository given and GITHUB_REPO_OWNER / GITHUB_REPO_NAME are not set.")
+    return f"{GITHUB_API_URL}/repos/{owner}/{repo}"
+
+# --- Shared GitHub HTTP Clients ---
+# One long-lived client per host, opened on first use and closed at shutdown (see
+# `lifespan` below), so calls for every repository reuse pooled keep-alive connections.
+# The token is chosen per request, so it is not part of the clients' default headers.
+github_clients: HostClients | None = None
+token_rotation = TokenRotation(GITHUB_TOKENS)
+# GraphQL has its own (point-based) quota per token, so it is rotated separately.
+graphql_token_rotation = TokenRotation(GITHUB_TOKENS)
+metrics.REGISTRY.gauge(
+    "github_tokens_quota_remaining", "GitHub quota left across all rotated tokens.",
+    callback=token_rotation.remaining,
+)
+
+def create_github_clients() -> HostClients:
+    limits = httpx.Limits(
+        max_connections=GITHUB_MAX_CONNECTIONS,
+        max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY,
+    )
+    return HostClients(
+        headers=GITHUB_HEADERS,
+        limits=limits,
+        http2=GITHUB_HTTP2,
+        timeout=httpx.Timeout(GITHUB_READ_TIMEOUT, connect=GITHUB_CONNECT_TIMEOUT),
+    )
+
+github_cache = GitHubResponseCache(max_bytes=GITHUB_CACHE_MAX_BYTES, disk_dir=GITHUB_CACHE_DIR)
+
+# Files pulled by `get_tree_snapshot`: blobs live in the store, keyed by SHA (and so
+# shared between repositories), and `repo_snapshots` maps each repository's API URL
+# and ref to (time taken, {snapshotted path: blob SHA}).
+blob_store = BlobStore(BLOB_STORE_DIRECTORY)
+repo_snapshots: dict[str, dict[str, tuple[float, dict[str, str]]]] = {}
+
+def snapshot_blob(base_url: str, ref: str, path: str) -> str | None:
+    """The blob SHA of `path` in the snapshot of `ref`, or None if it is not snapshotted or too old."""
+    snapshot = repo_snapshots.get(base_url, {}).get(ref)
+    if snapshot is None:
+        return None
+    taken_at, files = snapshot
+    if time.monotonic() - taken_at > SNAPSHOT_TTL_SECONDS:
+        repo_snapshots[base_url].pop(ref, None)
+        return None
+    return files.get(path)
+
+# Cached tool results, invalidated by the docs watcher and the GitHub webhook.
+result_cache = ToolResultCache(TOOL_CACHE_TTLS, max_bytes=TOOL_CACHE_MAX_BYTES)
+# Tools whose results come from GitHub, dropped from the cache when the webhook fires.
+GITHUB_TOOLS = ("get_repository", "get_repositories", "get_file_content", "get_tree_snapshot")
+
+# Inverted index over DOCS_DIRECTORY, built in `lifespan` at startup and kept
+# fresh by a background watcher that re-indexes only changed files; or the
+# prebuilt, memory-mapped DOCS_PACK.
+if DOCS_PACK:
+    docs_index = PackedDocsIndex(DOCS_PACK)
+else:
+    docs_index = LiveDocsIndex(DOCS_DIRECTORY, on_change=lambda: result_cache.invalidate("search_docs"))
+
+async def github_get(url: str) -> httpx.Response:
+    """
+    GETs a GitHub API URL, revalidating any cached copy with If-None-Match.
+    A 304 answer is served from the cache and does not cost rate-limit quota.
+    """
+    cached = await github_cache.get(url)
+    token = token_rotation.choose()
+    headers = {**auth_headers(token), **github_cache.conditional_headers(cached)}
+    started = time.perf_counter()
+    response = await github_clients.get(url).get(url, headers=headers)
+    metrics.record_github_response(response.status_code, time.perf_counter() - started, response.headers)
+    token_rotation.update(token, response.headers)
+    if response.status_code == 304 and cached is not None:
+        return github_cache.build_response(cached, response.request)
+    response.raise_for_status()
+    await github_cache.put(url, response)
+    return response
 
 # --- Tool Implementations (No changes here) ---
 
-def get_repository() -> dict:
-    # ... function content is unchanged
-    print("Tool 'get_repository' called.")
+async def get_repository(owner: str | None = None, repo: str | None = None) -> dict:
+    """Retrieves name, description, stars, forks and URL of a repository (default: the configured one)."""
+    print(f"Tool 'get_repository' called with owner: {owner}, repo: {repo}")
     try:
-        response = requests.get(GITHUB_API_BASE_URL, headers=GITHUB_HEADERS)
-        response.raise_for_status()
+        response = await github_get(repo_api_url(owner, repo))
         repo_data = response.json()
         return {
             "name": repo_data.get("full_name"), "description": repo_data.get("description"),
             "stars": repo_data.get("stargazers_count"), "forks": repo_data.get("forks_count"),
             "url": repo_data.get("html_url"),
         }
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         return {"error": f"HTTP error occurred: {http_err}", "status_code": http_err.response.status_code}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
 
-def get_file_content(path: str) -> dict:
-    
-    print(f"Tool 'get_file_content' called with path: {path}")
-    url = f"{GITHUB_API_BASE_URL}/contents/{path}"
+async def get_repositories(repositories: list[str], fields: list[str] | None = None) -> dict:
+    """
+    Retrieves metadata for many repositories ("owner/name") at once, with one
+    GitHub GraphQL query per batch of up to GRAPHQL_BATCH_SIZE repositories.
+    `fields` selects what to return (default: name, description, stars, forks, url).
+    Available fields: name, description, stars, forks, url, default_branch,
+    language, open_issues, archived, pushed_at.
+    """
+    print(f"Tool 'get_repositories' called for {len(repositories)} repositories.")
+    fields = list(fields or DEFAULT_FIELDS)
+    unknown = [field for field in fields if field not in REPOSITORY_FIELDS]
+    if unknown:
+        return {"error": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(REPOSITORY_FIELDS)}."}
+    if len(repositories) > GRAPHQL_MAX_REPOSITORIES:
+        return {"error": f"At most {GRAPHQL_MAX_REPOSITORIES} repositories can be requested at once."}
+    try:
+        for full_name in repositories:
+            split_repository(full_name)
+        batches = [repositories[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(repositories), GRAPHQL_BATCH_SIZE)]
+        results = await asyncio.gather(*(fetch_repository_batch(batch, fields) for batch in batches))
+    except ValueError as e:
+        return {"error": str(e)}
+    except GraphQLError as e:
+        return {"error": f"GitHub GraphQL error: {e}"}
+    except httpx.HTTPStatusError as http_err:
+        return {"error": f"HTTP error occurred: {http_err}", "status_code": http_err.response.status_code}
+    except Exception as e:
+        return {"error": f"An unexpected error occurred: {e}"}
+    output = {"repositories": [result for batch in results for result in batch], "upstream_calls": len(batches)}
+    # Missing repositories are a valid answer; any other per-repository failure (e.g.
+    # FORBIDDEN) marks the whole result as an error, so it is not cached.
+    failed = [result for result in output["repositories"] if result.get("error_type", "NOT_FOUND") != "NOT_FOUND"]
+    if failed:
+        output["error"] = f"{len(failed)} of {len(repositories)} repositories could not be fetched."
+    return output
+
+async def fetch_repository_batch(repositories: list[str], fields: list[str]) -> list[dict]:
+    """Runs one GraphQL query for a batch of repositories."""
+    query, variables = build_query(repositories, fields)
+    token = graphql_token_rotation.choose()
+    started = time.perf_counter()
+    response = await github_clients.get(GITHUB_GRAPHQL_URL).post(
+        GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables}, headers=auth_headers(token)
+    )
+    metrics.GITHUB_LATENCY.observe(time.perf_counter() - started, str(response.status_code))
+    graphql_token_rotation.update(token, response.headers)
+    response.raise_for_status()
+    return parse_response(repositories, fields, response.json())
+
+async def get_file_content(path: str, ref: str | None = None, owner: str | None = None,
+                           repo: str | None = None) -> dict:
+    """
+    Retrieves the decoded content of a file in a repository (default: the
+    configured one) at `ref` (default: the default branch).
+    """
+    print(f"Tool 'get_file_content' called with path: {path}, ref: {ref}")
     try:
-        response = requests.get(url, headers=GITHUB_HEADERS)
-        response.raise_for_status()
+        base_url = repo_api_url(owner, repo)
+        sha = snapshot_blob(base_url, ref or "HEAD", path)
+        if sha is not None and blob_store.has(sha):
+            # Already pulled by get_tree_snapshot at this ref: served locally, no API call.
+            content = await asyncio.to_thread(blob_store.read, sha)
+            return {"path": path, "content": content.decode("utf-8"), "source": "snapshot"}
+        url = f"{base_url}/contents/{path}"
+        if ref:
+            url += f"?ref={quote(ref, safe='')}"
+        response = await github_get(url)
         content_data = response.json()
+        if content_data.get("encoding") == "none":
+            # The Contents API stops inlining files above 1 MB.
+            return {"error": f"File '{path}' is too large to inline. Stream it from GET /v1/files/{path} instead.",
+                    "size": content_data.get("size")}
         if content_data.get("encoding") != "base64":
             return {"error": "File content is not base64 encoded."}
         decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
         return {"path": path, "content": decoded_content}
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         return {"error": f"HTTP error occurred for path '{path}': {http_err}", "status_code": http_err.response.status_code}
     except Exception as e:
         return {"error": f"An unexpected error occurred for path '{path}': {e}"}
 
+async def get_tree_snapshot(path: str = "", ref: str = "HEAD", owner: str | None = None,
+                            repo: str | None = None) -> dict:
+    """
+    Pulls every file under `path` at `ref` into the local blob store, so later
+    get_file_content calls for those files need no API requests. Costs one
+    recursive git trees call, plus one tarball download when any blob is missing.
+    """
+    print(f"Tool 'get_tree_snapshot' called with path: '{path}', ref: {ref}")
+    prefix = path.strip("/") + "/" if path.strip("/") else ""
+    try:
+        base_url = repo_api_url(owner, repo)
+        response = await github_get(f"{base_url}/git/trees/{quote(ref, safe='')}?recursive=1")
+        tree = response.json()
+        blobs = {
+            entry["path"]: entry["sha"] for entry in tree.get("tree", [])
+            if entry["type"] == "blob" and entry["path"].startswith(prefix)
+        }
+        missing = [p for p, sha in blobs.items() if not blob_store.has(sha)]
+        downloaded = 0
+        # A truncated tree listing is incomplete, so fall back to the tarball for everything.
+        if missing or tree.get("truncated"):
+            imported, downloaded = await download_tarball_into_store(base_url, ref, prefix)
+            if tree.get("truncated"):
+                blobs.update(imported)
+        # Snapshots of other paths at the same ref are merged; the merged snapshot
+        # keeps the oldest time, so SNAPSHOT_TTL_SECONDS bounds every file in it.
+        snapshots = repo_snapshots.setdefault(base_url, {})
+        current = snapshots.get(ref)
+        if current is not None and time.monotonic() - current[0] <= SNAPSHOT_TTL_SECONDS:
+            current[1].update(blobs)
+        else:
+            snapshots[ref] = (time.monotonic(), blobs)
+        return {
+            "path": path, "ref": ref, "tree_sha": tree.get("sha"),
+            "files": len(blobs), "downloaded": downloaded, "already_stored": len(blobs) - len(missing),
+        }
+    except httpx.HTTPStatusError as http_err:
+        return {"error": f"HTTP error occurred for tree '{ref}': {http_err}", "status_code": http_err.response.status_code}
+    except Exception as e:
+        return {"error": f"An unexpected error occurred for tree '{ref}': {e}"}
+
+async def download_tarball_into_store(base_url: str, ref: str, prefix: str) -> tuple[dict[str, str], int]:
+    """
+    Streams the repository tarball to a temp file and unpacks `prefix` into the
+    blob store. Returns {path: blob sha} and how many blobs were newly stored.
+    """
+    url = f"{base_url}/tarball/{quote(ref, safe='')}"
+    token = token_rotation.choose()
+    fd, tarball_path = tempfile.mkstemp(suffix=".tar.gz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async with github_clients.get(url).stream(
+                "GET", url, headers=auth_headers(token), follow_redirects=True
+            ) as response:
+                token_rotation.update(token, response.headers)
+                response.raise_for_status()
+                async for chunk in response.aiter_raw(FILE_STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+        return await asyncio.to_thread(blob_store.import_tarball, tarball_path, prefix)
+    finally:
+        os.remove(tarball_path)
+
 def search_docs(keyword: str) -> dict:
-   
+    """Searches the local markdown docs and returns ranked matches with snippets."""
     print(f"Tool 'search_docs' called with keyword: {keyword}")
-    matches = []
-    if not os.path.exists(DOCS_DIRECTORY):
+    if not DOCS_PACK and not os.path.exists(DOCS_DIRECTORY):
         return {"error": f"Docs directory '{DOCS_DIRECTORY}' not found."}
-    for filename in os.listdir(DOCS_DIRECTORY):
-        if filename.endswith(".md"):
-            filepath = os.path.join(DOCS_DIRECTORY, filename)
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                   # print(f"in search_docs, content is -->>>>> {content}")
-                    if keyword.lower() in content.lower():
-                        matches.append({"document": filename, "content_snippet": content[:200] + "..."})
-            except Exception as e:
-                print(f"Could not read file {filepath}: {e}")
+    # Served from the inverted index built at startup; no files are read here.
+    matches = docs_index.search(keyword)
     return {"keyword": keyword, "matches_found": len(matches), "results": matches}
 
-# --- Map Tool Names to Functions  ---
-AVAILABLE_TOOLS = {
-    "get_repository": get_repository,
-    "get_file_content": get_file_content,
-    "search_docs": search_docs,
-}
+# --- Tool Registry ---
+# Built-in tools are registered directly; plug-in tools are registered by import
+# path and only imported on first use. Argument models and schemas are cached.
+tool_registry = ToolRegistry()
+tool_registry.register(get_repository)
+tool_registry.register(get_repositories)
+tool_registry.register(get_file_content)
+tool_registry.register(get_tree_snapshot)
+tool_registry.register(search_docs)
+tool_registry.discover_entry_points()
+tool_registry.discover_targets(TOOL_MODULES)
+tool_registry.warm_schemas()
 
 # --- FastAPI Server & Rate Limiting Setup ---
 
@@ -105,13 +430,103 @@ def get_request_identifier(request: Request) -> str:
 def is_authenticated(request: Request) -> bool:
     return "authorization" in request.headers and request.headers["authorization"].startswith("Bearer ")
 
+
+def is_unlimited(request: Request) -> bool:
+    identifier = get_request_identifier(request)
+    return (token_fingerprint(identifier) if is_authenticated(request) else identifier) in UNLIMITED_CLIENTS
+
+
+def anonymous_limit_exempt(request: Request) -> bool:
+    return is_authenticated(request) or is_unlimited(request)
+
+
+def authenticated_limit_exempt(request: Request) -> bool:
+    return not is_authenticated(request) or is_unlimited(request)
+
 # Create the limiter instance using our identifier function.
 limiter = Limiter(key_func=get_request_identifier)
 
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """slowapi's 429, plus a Retry-After for when the exhausted window resets."""
+    response = _rate_limit_exceeded_handler(request, exc)
+    current_limit = getattr(request.state, "view_rate_limit", None)
+    if current_limit is not None:
+        reset_at, _ = limiter.limiter.get_window_stats(current_limit[0], *current_limit[1])
+        response.headers["Retry-After"] = str(max(1, math.ceil(reset_at - time.time())))
+    return response
+
+
+def request_priority(request: Request) -> str:
+    """
+    The client's priority class. A client may ask for a lower class than its
+    own with an X-Priority header (e.g. batch jobs), never a higher one.
+    """
+    identifier = get_request_identifier(request)
+    if is_authenticated(request):
+        priority = "high" if token_fingerprint(identifier) in FAIR_QUEUE_HIGH_PRIORITY_CLIENTS else "normal"
+    else:
+        priority = "high" if identifier in FAIR_QUEUE_HIGH_PRIORITY_CLIENTS else "low"
+    requested = request.headers.get("x-priority", "").lower()
+    if PRIORITY_WEIGHTS.get(requested, math.inf) < PRIORITY_WEIGHTS[priority]:
+        priority = requested
+    return priority
+
+# --- Warmup & Readiness ---
+# /readyz reports ready once these steps have run (see warmup.py).
+warmup = Warmup(WARMUP_TIMEOUT)
+
+async def warm_github_connections():
+    """Opens pooled connections to GitHub and syncs every token's quota (GET /rate_limit is free)."""
+    url = f"{GITHUB_API_URL}/rate_limit"
+    for token, response in await open_connections(github_clients.get(url), url, GITHUB_TOKENS, WARMUP_CONNECTIONS):
+        token_rotation.update(token, response.headers)
+
+async def warm_github_paths():
+    """Fetches the hot paths of the default repository into the ETag cache."""
+    base_url = repo_api_url()
+    await asyncio.gather(*(github_get(f"{base_url}/{path.strip('/')}".rstrip("/")) for path in WARMUP_GITHUB_PATHS))
+
+async def warm_docs_index():
+    if DOCS_PACK:
+        await asyncio.to_thread(docs_index.prefetch)
+
+warmup.step("github_connections", warm_github_connections)
+if WARMUP_GITHUB_PATHS and GITHUB_REPO_OWNER and GITHUB_REPO_NAME:
+    warmup.step("github_paths", warm_github_paths)
+warmup.step("docs_index", warm_docs_index)
+
+# Open the shared GitHub client and index the docs on startup, then warm up in the
+# background; clean everything up on shutdown.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global github_clients
+    github_clients = create_github_clients()
+    await asyncio.to_thread(docs_index.load)
+    print(f"Indexed {len(docs_index)} documents from '{DOCS_PACK or DOCS_DIRECTORY}'.")
+    watch = DOCS_WATCH_INTERVAL > 0 and not DOCS_PACK
+    watcher = asyncio.create_task(docs_index.watch(DOCS_WATCH_INTERVAL)) if watch else None
+    warming = asyncio.create_task(warmup.run())
+    try:
+        yield
+    finally:
+        # Out of the load balancer's rotation while draining.
+        warmup.ready = False
+        warming.cancel()
+        if watcher is not None:
+            watcher.cancel()
+        tool_executor.shutdown()
+        await github_clients.aclose()
+        github_clients = None
+
 # Create a FastAPI app instance and apply the limiter.
-app = FastAPI()
+# Responses are serialized with orjson and large JSON bodies are compressed.
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(
+    CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, offload_size=COMPRESSION_OFFLOAD_SIZE
+)
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 
 # --- Pydantic Models for Request Body  ---
@@ -127,34 +542,243 @@ class ToolRequest(BaseModel):
     tool_calls: List[ToolCall]
 
 
+# --- Tool Execution ---
+
+tool_executor = BoundedToolExecutor(TOOL_EXECUTOR_WORKERS, TOOL_EXECUTOR_QUEUE_DEPTH)
+metrics.REGISTRY.gauge(
+    "tool_executor_pending", "Sync tool calls running or queued on the thread pool.",
+    callback=lambda: tool_executor.pending,
+)
+TOOL_RESULT_CACHE = metrics.REGISTRY.counter(
+    "tool_result_cache_requests_total", "Cacheable tool calls by result cache outcome.", ("tool", "result")
+)
+metrics.REGISTRY.gauge("tool_result_cache_entries", "Tool results currently cached.", callback=lambda: len(result_cache))
+
+# Tool calls from all clients share FAIR_QUEUE_CAPACITY execution slots, handed out
+# by weighted fair queuing so one flooding client cannot starve the others.
+fair_scheduler = FairScheduler(FAIR_QUEUE_CAPACITY, MAX_CONCURRENT_TOOL_CALLS, FAIR_QUEUE_CLIENT_QUEUE)
+metrics.REGISTRY.gauge(
+    "fair_queue_waiting", "Tool calls waiting for an execution slot.",
+    callback=lambda: fair_scheduler.waiting,
+)
+FAIR_QUEUE_REJECTIONS = metrics.REGISTRY.counter(
+    "fair_queue_rejections_total", "Requests rejected because the client's queue was full.", ("priority",)
+)
+
+
+def fair_queue_full_handler(request: Request, exc: FairQueueFull):
+    FAIR_QUEUE_REJECTIONS.inc(exc.priority)
+    return ORJSONResponse({"error": str(exc)}, status_code=429, headers={"Retry-After": str(exc.retry_after)})
+
+
+app.add_exception_handler(FairQueueFull, fair_queue_full_handler)
+
+async def execute_tool_call(tool_call: ToolCall) -> dict:
+    """Runs a single tool call and wraps its result (or error) as a tool output."""
+    tool_name = tool_call.function.name
+
+    spec = tool_registry.get(tool_name)
+    if spec is None:
+        return {"call_id": tool_call.id, "output": {"error": f"Tool '{tool_name}' not found."}}
+
+    metrics.TOOLS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    timeout = TOOL_TIMEOUTS.get(tool_name, TOOL_TIMEOUT_SECONDS)
+    try:
+        args = spec.parse_arguments(tool_call.function.arguments)
+        cache_key = argument_key(tool_name, args) if result_cache.enabled_for(tool_name) else None
+        result = result_cache.get(cache_key) if cache_key else None
+        if cache_key:
+            TOOL_RESULT_CACHE.inc(tool_name, "miss" if result is None else "hit")
+        if result is None:
+            # Captured before the tool runs, so a result computed from data that was
+            # invalidated meanwhile (docs re-indexed, webhook) is not cached.
+            generation = result_cache.generation(tool_name)
+            # Async tools are awaited directly; blocking ones go to the bounded thread pool.
+            result = await tool_executor.run(spec.function, args, timeout)
+            if cache_key:
+                result_cache.put(tool_name, cache_key, result, generation)
+    except asyncio.TimeoutError:
+        result = {"error": f"Tool '{tool_name}' timed out after {timeout:g}s."}
+    except ToolArgumentsError as e:
+        result = {"error": f"Invalid arguments for tool '{tool_name}': {e}"}
+    except ToolExecutorBusy as e:
+        result = {"error": f"Server busy, tool '{tool_name}' was not run: {e}"}
+    except Exception as e:
+        result = {"error": f"Error executing tool '{tool_name}': {e}"}
+    finally:
+        metrics.TOOLS_IN_FLIGHT.dec()
+    metrics.record_tool_call(tool_name, metrics.tool_status(result), time.perf_counter() - started)
+    # The result goes out as a nested JSON object, not a JSON string inside the JSON response.
+    return {"call_id": tool_call.id, "output": result}
+
+
 # --- API Endpoint with Correct Rate Limiting ---
 
+@app.get("/v1/tools")
+async def list_tools():
+    """Lists the available tools with their cached JSON schemas."""
+    return {"tools": tool_registry.schemas()}
+
+
+# The route must be the outermost decorator, so it registers the rate-limited function.
+@app.post("/v1/tools")
 # The unauthenticated limit: it is skipped if the user IS authenticated.
-@limiter.limit("1000/hour", exempt_when=is_authenticated)
+@limiter.limit("1000/hour", exempt_when=anonymous_limit_exempt)
 # The authenticated limit: it is skipped if the user IS NOT authenticated.
-@limiter.limit("5000/hour", exempt_when=lambda request: not is_authenticated(request))
-@app.post("/v1/tools")
+# Neither applies to UNLIMITED_CLIENTS.
+@limiter.limit("5000/hour", exempt_when=authenticated_limit_exempt)
 async def handle_tool_call(request_body: ToolRequest, request: Request):
-    tool_call = request_body.tool_calls[0]
-    tool_name = tool_call.function.name
-    
-    if tool_name in AVAILABLE_TOOLS:
-        function_to_call = AVAILABLE_TOOLS[tool_name]
-        try:
-            args = json.loads(tool_call.function.arguments)
-            result = function_to_call(**args)
-            return {
-                "tool_outputs": [{ "call_id": tool_call.id, "output": json.dumps(result) }]
-            }
-        except Exception as e:
-            return {"error": f"Error executing tool '{tool_name}': {e}"}
-    else:
-        return {"error": f"Tool '{tool_name}' not found."}
+    # Every tool call in the batch is queued in the client's fair queue and runs
+    # once it gets a slot; each gets its own entry in tool_outputs (in the order
+    # it was requested). A client whose queue is full gets a 429 with Retry-After.
+    # A batch larger than the whole queue could never be admitted.
+    if len(request_body.tool_calls) > FAIR_QUEUE_CLIENT_QUEUE:
+        return ORJSONResponse(
+            {"error": f"Too many tool calls in one request ({len(request_body.tool_calls)}, "
+                      f"limit {FAIR_QUEUE_CLIENT_QUEUE})."},
+            status_code=413,
+        )
+    client, priority = get_request_identifier(request), request_priority(request)
+    with fair_scheduler.admit(client, priority, len(request_body.tool_calls), is_unlimited(request)) as reservation:
+
+        async def run_with_limit(tool_call: ToolCall) -> dict:
+            async with fair_scheduler.slot(client, priority, reservation):
+                return await execute_tool_call(tool_call)
+
+        tool_outputs = await asyncio.gather(*(run_with_limit(tc) for tc in request_body.tool_calls))
+    return {"tool_outputs": list(tool_outputs)}
+
+
+# --- Streaming File Endpoint ---
+
+# Headers from GitHub's raw response that are forwarded to the client as-is.
+STREAMED_FILE_HEADERS = ("content-range", "accept-ranges", "etag", "last-modified")
+
+@app.get("/v1/files/{path:path}")
+@limiter.limit("1000/hour", exempt_when=anonymous_limit_exempt)
+@limiter.limit("5000/hour", exempt_when=authenticated_limit_exempt)
+async def stream_file_content(path: str, request: Request, owner: str | None = None, repo: str | None = None):
+    """
+    Streams a repository file using GitHub's raw media type, which is not
+    subject to the Contents API's 1 MB limit. Bytes are relayed chunk by chunk,
+    so memory stays constant whatever the file size. A `Range` header is passed
+    through, so clients can fetch part of a file or resume a download.
+    `?owner=...&repo=...` selects a repository other than the configured one.
+    """
+    print(f"Streaming file content for path: {path}")
+    try:
+        url = f"{repo_api_url(owner, repo)}/contents/{path}"
+    except ValueError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+    token = token_rotation.choose()
+    headers = {"Accept": "application/vnd.github.raw", **auth_headers(token)}
+    if "range" in request.headers:
+        headers["Range"] = request.headers["range"]
+    client = github_clients.get(url)
+    upstream_request = client.build_request("GET", url, headers=headers)
+    try:
+        upstream = await client.send(upstream_request, stream=True, follow_redirects=True)
+    except httpx.TransportError as e:
+        return ORJSONResponse(
+            {"error": f"Could not reach GitHub for path '{path}': {type(e).__name__}: {e}"}, status_code=502
+        )
+    token_rotation.update(token, upstream.headers)
+
+    if upstream.status_code >= 400:
+        await upstream.aread()
+        await upstream.aclose()
+        return ORJSONResponse(
+            {"error": f"HTTP error occurred for path '{path}': {upstream.status_code} {upstream.reason_phrase}",
+             "status_code": upstream.status_code},
+            status_code=upstream.status_code,
+        )
+
+    response_headers = {name: upstream.headers[name] for name in STREAMED_FILE_HEADERS if name in upstream.headers}
+    # The body is relayed decoded, so the length only holds when GitHub did not compress it.
+    if "content-length" in upstream.headers and "content-encoding" not in upstream.headers:
+        response_headers["content-length"] = upstream.headers["content-length"]
+    return StreamingResponse(
+        upstream.aiter_bytes(FILE_STREAM_CHUNK_SIZE),
+        status_code=upstream.status_code,
+        headers=response_headers,
+        media_type=upstream.headers.get("content-type", "application/octet-stream"),
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+# --- Cache Invalidation Webhook ---
+
+def parse_webhook_payload(body: bytes, content_type: str) -> dict:
+    """
+    The delivery's JSON payload, sent either as the body or, for webhooks set up
+    with the form content type, in its `payload` field. Returns {} (and logs) when
+    it cannot be decoded, so the delivery still invalidates the caches.
+    """
+    try:
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            body = parse_qs(body.decode("utf-8")).get("payload", ["{}"])[0].encode("utf-8")
+        payload = orjson.loads(body or b"{}")
+    except (UnicodeDecodeError, orjson.JSONDecodeError) as e:
+        print(f"GitHub webhook payload could not be decoded: {e}")
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+@app.post("/v1/webhooks/github")
+async def github_webhook(request: Request):
+    """
+    Receives GitHub webhook deliveries and drops the cached results of the
+    GitHub tools, so the next call sees the change. A push also discards the
+    pushed repository's tree snapshot, since its files may have changed.
+    """
+    if not GITHUB_WEBHOOK_SECRET:
+        return ORJSONResponse({"error": "Webhook is not configured."}, status_code=404)
+    body = await request.body()
+    expected = "sha256=" + hmac.new(GITHUB_WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, request.headers.get("x-hub-signature-256", "")):
+        return ORJSONResponse({"error": "Invalid webhook signature."}, status_code=401)
+
+    event = request.headers.get("x-github-event", "")
+    payload = parse_webhook_payload(body, request.headers.get("content-type", ""))
+    dropped = sum(result_cache.invalidate(tool) for tool in GITHUB_TOOLS)
+    if event == "push":
+        full_name = (payload.get("repository") or {}).get("full_name")
+        if full_name:
+            repo_snapshots.pop(f"{GITHUB_API_URL}/repos/{full_name}", None)
+        else:
+            # The pushed repository is unknown, so no snapshot can be trusted.
+            repo_snapshots.clear()
+    print(f"GitHub webhook '{event}': dropped {dropped} cached results.")
+    return {"event": event, "invalidated": dropped}
+
+
+# --- Health Endpoints ---
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and its event loop answers."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 503 until the startup warmup has finished, and again while shutting down."""
+    return ORJSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+
+# --- Metrics Endpoint ---
+
+@app.get("/metrics")
+async def get_metrics():
+    """Exposes tool, upstream and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 # --- Main Execution Block (No changes here) ---
 if __name__ == "__main__":
     print("Starting FastAPI Tool Server with Rate Limiting...")
-    print(f"Configured for repository: {GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}")
-    print("Available tools:", ", ".join(AVAILABLE_TOOLS.keys()))
+    print(f"Default repository: {GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}")
+    print(f"Rotating {len(GITHUB_TOKENS)} GitHub token(s).")
+    print("Available tools:", ", ".join(tool_registry.names()))
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,62 @@
+"""
+Keeps the modules shared by both tool servers in sync.
+
+The FastMCP server ("MCPAssignment - Fast mcp/server") is a separate project
+with its own requirements, so it carries copies of these modules instead of
+importing them from here. The files in this directory are the source of
+truth. Each copy starts with a header saying so, in place of the source's
+marker line. After changing a shared module, run:
+
+    python server/sync_shared_modules.py            # rewrite the copies
+    python server/sync_shared_modules.py --check    # exit 1 if a copy is stale
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+SHARED_MODULES = (
+    "docs_index.py", "docs_pack.py", "github_cache.py", "github_clients.py", "metrics.py", "warmup.py",
+)
+SOURCE_DIR = Path(__file__).resolve().parent
+COPY_DIR = SOURCE_DIR.parent.parent / "MCPAssignment - Fast mcp" / "server"
+
+SOURCE_MARKER = "# Shared with the FastMCP server: after editing, run server/sync_shared_modules.py.\n"
+COPY_HEADER = (
+    "# Copy of MCPAssignment/server/{name}, the source of truth. Do not edit it here:\n"
+    "# change that file and run server/sync_shared_modules.py.\n"
+)
+
+
+def expected_copy(name: str) -> str:
+    source = (SOURCE_DIR / name).read_text(encoding="utf-8")
+    if not source.startswith(SOURCE_MARKER):
+        raise ValueError(f"{SOURCE_DIR / name} does not start with the shared-module marker.")
+    return COPY_HEADER.format(name=name) + source[len(SOURCE_MARKER):]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report stale copies, exit 1 if there are any")
+    args = parser.parse_args()
+
+    stale = []
+    for name in SHARED_MODULES:
+        copy = COPY_DIR / name
+        expected = expected_copy(name)
+        if copy.exists() and copy.read_text(encoding="utf-8") == expected:
+            continue
+        stale.append(name)
+        if not args.check:
+            copy.write_text(expected, encoding="utf-8")
+            print(f"Updated {copy}")
+    if args.check and stale:
+        print(f"Out of date in {COPY_DIR}: {', '.join(stale)}. Run server/sync_shared_modules.py.")
+        return 1
+    if not stale:
+        print("Shared modules are in sync.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Bounded executor for running tools without blocking the event loop.
+
+Synchronous tools run on a fixed-size thread pool; async tools are awaited
+directly. Every call is subject to a per-tool timeout, and once the pool and
+its queue are full, new sync calls are rejected instead of piling up.
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class ToolExecutorBusy(Exception):
+    pass
+
+
+class BoundedToolExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0  # sync calls running or waiting for a worker thread
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    async def run(self, func: Callable, kwargs: dict, timeout: float | None):
+        """Runs a tool and returns its result; raises asyncio.TimeoutError or ToolExecutorBusy."""
+        if inspect.iscoroutinefunction(func):
+            return await asyncio.wait_for(func(**kwargs), timeout)
+
+        if self.pending >= self.max_workers + self.max_queue:
+            raise ToolExecutorBusy(f"Tool queue is full ({self.pending} calls pending). Retry later.")
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self._pool.submit(func, **kwargs)
+        # Released when the thread really finishes (or the queued call is cancelled),
+        # not when the caller stops waiting, so a timed-out call still counts until it ends.
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
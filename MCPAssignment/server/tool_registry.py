@@ -0,0 +1,145 @@
+"""
+Registry of the tools the server can execute.
+
+Tools are registered either directly (built-in functions) or lazily by an
+import path such as "my_package.tools:lint_file", including ones discovered
+from the `mcp_tools` entry point group. A lazy tool's module is imported the
+first time the tool is called or described, so adding tools does not slow
+down startup.
+
+For each tool a pydantic argument model is derived from the function
+signature once and cached, together with its JSON schema. Incoming argument
+strings are validated straight from JSON against that model, so calls with
+missing, misspelled or mistyped arguments are rejected with a clear message.
+"""
+
+import importlib
+import inspect
+from importlib.metadata import entry_points
+from typing import Any, Callable
+
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+
+ENTRY_POINT_GROUP = "mcp_tools"
+
+
+class ToolArgumentsError(ValueError):
+    pass
+
+
+def _import_target(target: str) -> Callable:
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ToolSpec:
+    def __init__(self, name: str, function: Callable | None = None, target: str | None = None):
+        self.name = name
+        self.target = target
+        self._function = function
+        self._arguments_model: type[BaseModel] | None = None
+        self._schema: dict | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._function is not None
+
+    @property
+    def function(self) -> Callable:
+        if self._function is None:
+            self._function = _import_target(self.target)
+        return self._function
+
+    @property
+    def arguments_model(self) -> type[BaseModel]:
+        if self._arguments_model is None:
+            fields = {}
+            for param in inspect.signature(self.function).parameters.values():
+                annotation = Any if param.annotation is inspect.Parameter.empty else param.annotation
+                default = ... if param.default is inspect.Parameter.empty else param.default
+                fields[param.name] = (annotation, default)
+            self._arguments_model = create_model(
+                f"{self.name}_arguments", __config__=ConfigDict(extra="forbid"), **fields
+            )
+        return self._arguments_model
+
+    @property
+    def schema(self) -> dict:
+        """The tool in the OpenAI function-calling format; computed once."""
+        if self._schema is None:
+            parameters = self.arguments_model.model_json_schema()
+            parameters.pop("title", None)
+            description = inspect.getdoc(self.function) or ""
+            self._schema = {
+                "type": "function",
+                "function": {"name": self.name, "description": description.strip(), "parameters": parameters},
+            }
+        return self._schema
+
+    def parse_arguments(self, raw_arguments: str) -> dict:
+        """Validates a JSON argument string and returns the keyword arguments for the call."""
+        try:
+            parsed = self.arguments_model.model_validate_json(raw_arguments or "{}")
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'arguments'}: {error['msg']}"
+                for error in e.errors(include_url=False)
+            )
+            raise ToolArgumentsError(problems) from None
+        return {name: getattr(parsed, name) for name in type(parsed).model_fields}
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: dict[str, ToolSpec] = {}
+
+    def register(self, function: Callable, name: str | None = None) -> Callable:
+        """Registers an already-imported function. Usable as a decorator."""
+        name = name or function.__name__
+        self._tools[name] = ToolSpec(name, function=function)
+        return function
+
+    def register_lazy(self, name: str, target: str) -> None:
+        """Registers a tool by "module:function" path without importing it."""
+        self._tools[name] = ToolSpec(name, target=target)
+
+    def discover_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """Registers (lazily) every tool installed under the entry point group."""
+        for entry_point in entry_points(group=group):
+            self.register_lazy(entry_point.name, entry_point.value)
+
+    def discover_targets(self, targets: str) -> None:
+        """
+        Registers (lazily) a comma-separated list of "module:function" paths.
+        Raises ValueError for an entry that is not of that form.
+        """
+        for target in filter(None, (item.strip() for item in targets.split(","))):
+            module_name, _, attribute = target.partition(":")
+            if not module_name or not attribute.isidentifier():
+                raise ValueError(f"Invalid tool path '{target}': expected \"module:function\".")
+            self.register_lazy(attribute, target)
+
+    def get(self, name: str) -> ToolSpec | None:
+        return self._tools.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._tools)
+
+    def schemas(self) -> list[dict]:
+        """
+        The schemas of every tool that can be loaded. A plug-in that fails to
+        import is logged and left out, so it does not break the listing.
+        """
+        schemas = []
+        for spec in self._tools.values():
+            try:
+                schemas.append(spec.schema)
+            except Exception as e:
+                print(f"Tool '{spec.name}' is unavailable: could not load '{spec.target}': {type(e).__name__}: {e}")
+        return schemas
+
+    def warm_schemas(self) -> None:
+        """Precomputes the argument models and schemas of the tools already imported."""
+        for spec in self._tools.values():
+            if spec.loaded:
+                spec.schema